@@ -1,13 +1,160 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import norm
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.cache import SimulationCache, cached
+from zyllica.lazy import lazy_import
+from zyllica.parallel import iter_blocks, run_blocks
+from zyllica.sampling import (check_path_sampling, compare_sampling_modes, control_variate_weights, standard_normals,
+                              tail_metrics)
+from zyllica.stats import Histogram, Moments, QuantileSketch
+from zyllica.style import paper_style
+from zyllica.trace import stage, traced
+
+plt = lazy_import('matplotlib.pyplot')
+
+# ----------------------------------------------------------------------------------
+# CONFIGURATION (Dark Mode Style, applied while each figure function runs)
+# ----------------------------------------------------------------------------------
+PLOT_STYLE = 'dark_background'
 
 # ----------------------------------------------------------------------------------
-# CONFIGURATION (Dark Mode Style)
+# SIMULATION ENGINE
 # ----------------------------------------------------------------------------------
-plt.style.use('dark_background')
+def simulate_gbm_chunks(S0, mu, sigma, dt, N, sims, chunk_size=50_000, rng=None, sampling='plain'):
+    """Yield GBM paths as [N x chunk] blocks so the full [N x sims] matrix never exists.
+
+    Shocks are drawn time-major, so a single chunk (chunk_size >= sims) consumes the
+    random stream in the same order as the original per-day loop. `sampling` selects
+    plain, antithetic or scrambled Sobol shocks (see zyllica.sampling); the control
+    variate is applied by `terminal_tail_risk` and the dense plot mode, not here.
+    """
+    check_path_sampling(sampling, 'terminal_tail_risk')
+    if rng is None:
+        rng = np.random
+    drift = (mu - 0.5 * sigma**2) * dt
+    vol = sigma * np.sqrt(dt)
+
+    for start in range(0, sims, chunk_size):
+        n = min(chunk_size, sims - start)
+        log_paths = np.empty((N, n))
+        log_paths[0] = 0.0
+        shocks = standard_normals(rng, (N - 1, n), sampling)
+        np.cumsum(drift + vol * shocks, axis=0, out=log_paths[1:])
+        np.exp(log_paths, out=log_paths)
+        log_paths *= S0
+        yield log_paths
+
+
+def _gbm_block(rng, n, S0, mu, sigma, dt, N, sampling='plain'):
+    """One [N x n] block of paths (worker task for the dense mode)."""
+    return next(simulate_gbm_chunks(S0, mu, sigma, dt, N, n, chunk_size=n, rng=rng, sampling=sampling))
+
+
+def simulate_gbm_terminal(S0, mu, sigma, horizon, sims, rng=None, sampling='plain'):
+    """Exact draw of S_T without stepping through the path.
+
+    GBM has a closed-form terminal law, log(S_T / S0) ~ N((mu - sigma^2/2) T, sigma^2 T),
+    so one vectorized call of `sims` normals replaces N x sims daily increments.
+    """
+    if rng is None:
+        rng = np.random
+    Z = standard_normals(rng, (1, sims), sampling)[0]
+    return S0 * np.exp((mu - 0.5 * sigma**2) * horizon + sigma * np.sqrt(horizon) * Z)
+
+
+def _terminal_block(rng, n, S0, mu, sigma, horizon, sampling):
+    """Terminal values of one block (worker task for the terminal-only mode)."""
+    return simulate_gbm_terminal(S0, mu, sigma, horizon, n, rng, sampling)
+
+
+def terminal_tail_risk(sims=5000, S0=100, mu=0.08, sigma=0.20, T=1.0, dt=1/252, alpha=0.05,
+                       seed=42, workers=None, block_size=1_000_000, sampling='plain'):
+    """Terminal mean, VaR and CVaR straight from the exact S_T sampler.
+
+    Same horizon as `paths[-1]` in the plots, about N times cheaper than simulating
+    the full paths when only terminal tail risk is needed.
+    """
+    N = int(T / dt)
+    horizon = (N - 1) * dt
+    final_values = np.concatenate(run_blocks(_terminal_block, sims, seed, block_size=block_size,
+                                             workers=workers, args=(S0, mu, sigma, horizon, sampling)))
+    weights = None
+    if sampling == 'control_variate':
+        weights = control_variate_weights(final_values, S0 * np.exp(mu * horizon))
+    mean_final, var_95, cvar_95 = tail_metrics(final_values, alpha, weights)
+    return {'mean': mean_final, 'var_95': var_95, 'cvar_95': cvar_95}
+
+
+def _cone_block(rng, n, S0, mu, sigma, dt, N, edges, sketch_size, n_sample_paths, sampling):
+    """Partial statistics of one block of paths (worker task for the streaming mode)."""
+    paths = _gbm_block(rng, n, S0, mu, sigma, dt, N, sampling)
+    sketch = QuantileSketch(N, size=sketch_size)
+    sketch.update(paths)
+    hist = Histogram(edges)
+    hist.update(paths[-1])
+    moments = Moments()
+    moments.update(paths[-1])
+    return sketch, hist, moments, paths[:, :n_sample_paths].copy()
 
-def generate_stochastic_forecast_plots():
+
+def stream_cone_statistics(S0, mu, sigma, T, dt, sims, levels=(5, 50, 95), alpha=0.05,
+                           chunk_size=50_000, sketch_size=4096, n_sample_paths=200,
+                           hist_bins=80, seed=42, workers=None, sampling='plain'):
+    """Fan-chart bands and terminal VaR/CVaR from chunked paths.
+
+    Memory is O(N x sketch_size) instead of O(N x sims): each chunk is reduced to a
+    per-time-step quantile sketch, a terminal histogram and terminal moments by a
+    worker, and the partials are merged in chunk order.
+    """
+    if sampling == 'control_variate':
+        raise ValueError("control_variate reweights the full terminal sample; use the dense mode")
+    N = int(T / dt)
+
+    # Terminal histogram edges from the analytic log-normal law (+/- 6 sd)
+    m_T = np.log(S0) + (mu - 0.5 * sigma**2) * (N - 1) * dt
+    s_T = sigma * np.sqrt((N - 1) * dt)
+    edges = np.exp(np.linspace(m_T - 6 * s_T, m_T + 6 * s_T, hist_bins + 1))
+
+    blocks = iter_blocks(_cone_block, sims, seed, block_size=chunk_size, workers=workers,
+                         args=(S0, mu, sigma, dt, N, edges, sketch_size, n_sample_paths, sampling))
+    sketch, hist, moments, sample_paths = next(blocks)
+    for block_sketch, block_hist, block_moments, _ in blocks:
+        sketch.merge(block_sketch)
+        hist.merge(block_hist)
+        moments.merge(block_moments)
+
+    bands = sketch.quantile(np.asarray(levels) / 100)
+
+    return {
+        'bands': {level: bands[i] for i, level in enumerate(levels)},
+        'sample_paths': sample_paths,
+        'hist_counts': hist.counts,
+        'hist_edges': hist.edges,
+        'var': sketch.quantile(alpha)[-1],
+        'cvar': sketch.tail_mean(alpha, row=-1),
+        'mean': moments.mean,
+    }
+
+
+def sampling_report(sims=64_000, S0=100, mu=0.08, sigma=0.20, T=1.0, dt=1/252, alpha=0.05,
+                    replicates=16, seed=42, workers=None):
+    """Terminal mean / VaR / CVaR standard errors of every sampling mode on one budget.
+
+    The control variate is S_T itself, with analytic E[S_T] = S0 * exp(mu * T).
+    """
+    horizon = (int(T / dt) - 1) * dt
+    expected = S0 * np.exp(mu * horizon)
+    return compare_sampling_modes(_terminal_block, (S0, mu, sigma, horizon), sims, expected,
+                                  alpha=alpha, replicates=replicates, seed=seed, workers=workers)
+
+
+@traced
+@paper_style(PLOT_STYLE)
+def generate_stochastic_forecast_plots(sims=5000, streaming=False, chunk_size=50_000, seed=42, workers=None,
+                                       sampling='plain', cache=None):
     # 1. PARAMETERS (Based on the Paper's logic)
     S0 = 100       # Initial Value ($100)
     mu = 0.08      # Drift (8% expected annual return)
@@ -15,37 +162,59 @@ def generate_stochastic_forecast_plots():
     T = 1.0        # Time horizon (1 year)
     dt = 1/252     # Daily time steps
     N = int(T/dt)  # Total steps
-    sims = 5000    # Number of Monte Carlo simulations
+    # sims: Number of Monte Carlo simulations
 
     # 2. CORE SIMULATION (Geometric Brownian Motion)
     # S_t = S_{t-1} * exp((mu - 0.5*sigma^2)*dt + sigma*sqrt(dt)*Z)
-    
-    # Initialize matrix [Days x Simulations]
-    paths = np.zeros((N, sims))
-    paths[0] = S0
-    
-    np.random.seed(42) # For reproducibility
-    
-    for t in range(1, N):
-        Z = np.random.standard_normal(sims) # Random shocks
-        drift = (mu - 0.5 * sigma**2) * dt
-        shock = sigma * np.sqrt(dt) * Z
-        paths[t] = paths[t-1] * np.exp(drift + shock)
+    # Chunks run on a process pool with per-chunk Generator streams (reproducible by seed)
+
+    if streaming:
+        # Chunked mode: bands come from quantile sketches, no [Days x Simulations] matrix
+        with stage('stream_cone_statistics', sims=sims, chunk_size=chunk_size) as traced_stage:
+            stats = stream_cone_statistics(S0, mu, sigma, T, dt, sims, levels=(5, 50, 95),
+                                           chunk_size=chunk_size, seed=seed, workers=workers, sampling=sampling)
+            traced_stage.record(sample_paths=stats['sample_paths'], hist_counts=stats['hist_counts'])
+        p5, p50, p95 = (stats['bands'][level] for level in (5, 50, 95))
+        sample_paths = stats['sample_paths']
+        var_95, cvar_95, mean_final = stats['var'], stats['cvar'], stats['mean']
+        hist_values = 0.5 * (stats['hist_edges'][1:] + stats['hist_edges'][:-1])
+        hist_weights, hist_bins = stats['hist_counts'], stats['hist_edges']
+    else:
+        # Full matrix [Days x Simulations] (memory-mapped from the cache on repeat runs)
+        # The control variate draws plain paths and reweights the terminal metrics below
+        draws = 'plain' if sampling == 'control_variate' else sampling
+        params = dict(S0=S0, mu=mu, sigma=sigma, dt=dt, N=N, sampling=draws, chunk_size=chunk_size)
+        with stage('simulate', sims=sims, sampling=sampling) as traced_stage:
+            paths = cached(cache, 'cone_gbm_paths', params, seed, sims,
+                           lambda: np.hstack(run_blocks(_gbm_block, sims, seed, block_size=chunk_size,
+                                                        workers=workers, args=(S0, mu, sigma, dt, N, draws))))
+            traced_stage.record(paths=paths)
+
+        # Calculate Percentiles over time (single partition pass for all levels)
+        with stage('percentiles'):
+            p5, p50, p95 = np.percentile(paths, [5, 50, 95], axis=1)
+        sample_paths = paths[:, :200]
+
+        final_values = paths[-1]
+        with stage('tail_metrics'):
+            weights = None
+            if sampling == 'control_variate':
+                # Reweight against the analytic E[S_T] = S0 * exp(mu * T)
+                weights = control_variate_weights(final_values, S0 * np.exp(mu * (N - 1) * dt))
+            # VaR (5th percentile) and CVaR (Avg of the tail)
+            mean_final, var_95, cvar_95 = tail_metrics(final_values, 0.05, weights)
+        hist_values, hist_weights, hist_bins = final_values, None, 80
 
     # ----------------------------------------------------------------------------------
     # PLOT A: THE CONE OF UNCERTAINTY
     # ----------------------------------------------------------------------------------
-    # Calculate Percentiles over time
-    p5 = np.percentile(paths, 5, axis=1)   # 95% VaR Line (Worst case)
-    p50 = np.percentile(paths, 50, axis=1) # Median (Realistic Expectation)
-    p95 = np.percentile(paths, 95, axis=1) # Best case
-    
+    # p5: 95% VaR Line (Worst case), p50: Median (Realistic Expectation), p95: Best case
     time_axis = np.linspace(0, T, N)
     
     fig, ax = plt.subplots(figsize=(12, 7))
     
     # Plot random individual paths (faint background)
-    ax.plot(time_axis, paths[:, :200], color='cyan', alpha=0.03, lw=0.5)
+    ax.plot(time_axis, sample_paths, color='cyan', alpha=0.03, lw=0.5)
     
     # Plot Statistical Cone
     ax.plot(time_axis, p95, color='#00ff00', lw=2, ls='--', label='Upside Potential (95th %)')
@@ -68,19 +237,16 @@ def generate_stochastic_forecast_plots():
                 arrowprops=dict(facecolor='#ff3333', arrowstyle='->'), color='#ff3333', fontweight='bold')
     
     plt.tight_layout()
-    plt.show() # Shows Plot A
+    with stage('show'):
+        plt.show() # Shows Plot A
 
     # ----------------------------------------------------------------------------------
     # PLOT B: TERMINAL DISTRIBUTION (TAIL RISK)
     # ----------------------------------------------------------------------------------
-    final_values = paths[-1]
-    var_95 = np.percentile(final_values, 5)
-    cvar_95 = final_values[final_values <= var_95].mean() # Conditional VaR (Avg of the tail)
-    
     fig, ax = plt.subplots(figsize=(12, 7))
     
     # Histogram
-    n, bins, patches = ax.hist(final_values, bins=80, color='#00cc99', alpha=0.6, edgecolor='none')
+    n, bins, patches = ax.hist(hist_values, bins=hist_bins, weights=hist_weights, color='#00cc99', alpha=0.6, edgecolor='none')
     
     # Color the "Death Zone" (Tail Risk) in Red
     for c, p in zip(bins, patches):
@@ -90,7 +256,7 @@ def generate_stochastic_forecast_plots():
     # Vertical Lines
     ax.axvline(var_95, color='white', ls='--', lw=2, label=f'VaR (95%): ${var_95:.2f}')
     ax.axvline(cvar_95, color='yellow', ls=':', lw=2, label=f'CVaR (Expected Loss): ${cvar_95:.2f}')
-    ax.axvline(np.mean(final_values), color='white', lw=2, label=f'Mean: ${np.mean(final_values):.2f}')
+    ax.axvline(mean_final, color='white', lw=2, label=f'Mean: ${mean_final:.2f}')
     
     # Styling
     ax.set_title('Tail Risk Analysis: Identifying Extreme Loss Scenarios', fontsize=20, fontweight='bold', color='white', pad=20)
@@ -107,7 +273,8 @@ def generate_stochastic_forecast_plots():
     plt.figtext(0.5, 0.02, note, ha='center', fontsize=11, color='#aaaaaa', style='italic')
     
     plt.subplots_adjust(bottom=0.15)
-    plt.show() # Shows Plot B
+    with stage('show'):
+        plt.show() # Shows Plot B
 
 if __name__ == "__main__":
-    generate_stochastic_forecast_plots()
+    generate_stochastic_forecast_plots(cache=SimulationCache())
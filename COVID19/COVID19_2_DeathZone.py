@@ -1,25 +1,37 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-def generate_landscape_heatmap():
-    # 1. Setup Dark Theme
-    plt.style.use('dark_background')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.lazy import lazy_import
+from zyllica.style import paper_style
+from zyllica.surface import pyramid_level, tiled_pyramid
+
+plt = lazy_import('matplotlib.pyplot')
+
+def death_zone_risk(exposure, periodontal):
+    # Risk Calculation (broadcasts a row of exposures against a column of periodontal levels)
+    return exposure * periodontal
+
+@paper_style('dark_background')
+def generate_landscape_heatmap(resolution=100, risk=death_zone_risk, tile=2048, directory=None):
+    # 1. Dark Theme (applied by @paper_style for the duration of the call)
     
     # 2. Define Data
-    exposure_levels = np.linspace(0, 1, 100)
-    periodontal_health = np.linspace(0, 1, 100)
-    X, Y = np.meshgrid(exposure_levels, periodontal_health)
-    
-    # Risk Calculation
-    risk_matrix = X * Y
+    # Evaluated tile by tile into memory-mapped files (no meshgrid copies) together with a
+    # downsampled pyramid, so poster resolutions like 20,000 x 20,000 run in bounded memory
+    exposure_levels = np.linspace(0, 1, resolution)
+    periodontal_health = np.linspace(0, 1, resolution)
+    pyramid = tiled_pyramid(risk, exposure_levels, periodontal_health, tile=tile, directory=directory)
     
     # 3. Create Plot (LANDSCAPE orientation)
     # figsize=(12, 7) creates the wide format
     fig, ax = plt.subplots(figsize=(12, 7))
     
-    # Heatmap
-    im = ax.imshow(risk_matrix, 
+    # Heatmap (drawn from the downsampled pyramid level that matches the figure's pixels)
+    pixels = fig.get_size_inches() * fig.dpi
+    im = ax.imshow(pyramid_level(pyramid, pixels), 
                    extent=[0, 100, 0, 100], 
                    origin='lower', 
                    cmap='Reds', 
@@ -71,6 +83,7 @@ def generate_landscape_heatmap():
     plt.subplots_adjust(bottom=0.15)
     
     plt.show()
+    return pyramid
 
 if __name__ == "__main__":
     generate_landscape_heatmap()
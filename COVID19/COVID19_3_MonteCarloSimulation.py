@@ -1,69 +1,162 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-def generate_monte_carlo_tail_risk():
-    # 1. Setup Dark Theme
-    plt.style.use('dark_background')
-    
-    # 2. Simulation Parameters
-    np.random.seed(42) # For reproducibility
-    N = 10000
-    
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.cache import SimulationCache, cached
+from zyllica.lazy import lazy_import
+from zyllica.parallel import iter_blocks, run_blocks
+from zyllica.stats import Histogram, QuantileSketch
+from zyllica.style import paper_style
+
+plt = lazy_import('matplotlib.pyplot')
+
+def _population_block(rng, n):
     # Generate Population Attributes (Randomized)
     # Using Beta distributions to simulate realistic population (most are average/healthy, few are severe)
     # PDG: Periodontal Disease (0=Healthy, 1=Severe)
-    pdg_scores = np.random.beta(2, 5, N) 
+    pdg_scores = rng.beta(2, 5, n)
     
     # ARF: Risk Factors (Diabetes, Hypertension)
-    arf_scores = np.random.beta(2, 5, N) 
+    arf_scores = rng.beta(2, 5, n)
     
     # ISG: Immune Deficiency (0=Strong, 1=Compromised)
     # Higher score = Weaker system (contributes to lethality)
-    isg_scores = np.random.beta(2, 5, N)
-    
-    # Calculate Lethality Index (LGI)
-    # Formula: LGI = PDG * ARF * ISG
+    isg_scores = rng.beta(2, 5, n)
+    return np.vstack([pdg_scores, arf_scores, isg_scores])
+
+def _cohort_block(rng, n, edges, sketch_size):
+    """Partial statistics of one cohort (worker task for the streaming mode)."""
+    pdg_scores, arf_scores, isg_scores = _population_block(rng, n)
     lethality_index = pdg_scores * arf_scores * isg_scores
+    sketch = QuantileSketch(1, size=sketch_size)
+    sketch.update(lethality_index)
+    counts, pdg_sums, lgi_sums = Histogram(edges), Histogram(edges), Histogram(edges)
+    counts.update(lethality_index)
+    pdg_sums.update(lethality_index, weights=pdg_scores)
+    lgi_sums.update(lethality_index, weights=lethality_index)
+    return sketch, counts, pdg_sums, lgi_sums
+
+def stream_population_statistics(N, tail=0.95, seed=42, workers=None, block_size=1_000_000,
+                                 bins=20_000, sketch_size=8192):
+    """Death threshold, victim/survivor averages and LGI histogram in one chunked pass.
+
+    Memory is O(bins + sketch_size) for any N: each cohort is reduced by a worker
+    to a quantile sketch of the lethality index and fine fixed-edge histograms of
+    counts, PDG sums and LGI sums, merged in cohort order. Once the threshold is
+    read from the sketch, the conditional averages follow from the histograms
+    (the bin holding the threshold is split pro rata).
+    """
+    edges = np.linspace(0, 1, bins + 1) # LGI = PDG * ARF * ISG lies in [0, 1]
+    blocks = iter_blocks(_cohort_block, N, seed, block_size=block_size, workers=workers,
+                         args=(edges, sketch_size))
+    sketch, counts, pdg_sums, lgi_sums = next(blocks)
+    for block_sketch, block_counts, block_pdg, block_lgi in blocks:
+        sketch.merge(block_sketch)
+        counts.merge(block_counts)
+        pdg_sums.merge(block_pdg)
+        lgi_sums.merge(block_lgi)
+
+    threshold = sketch.quantile(tail)[0]
+    k = min(np.searchsorted(edges, threshold, side='right') - 1, bins - 1)
+    below = np.zeros(bins)
+    below[:k] = 1.0
+    below[k] = (threshold - edges[k]) / (edges[k + 1] - edges[k])
+
+    def split(h):
+        return h.counts @ below, h.counts @ (1 - below)
+
+    n_survivors, n_victims = split(counts)
+    pdg_survivors, pdg_victims = split(pdg_sums)
+    _, lgi_victims = split(lgi_sums)
+    return {
+        'threshold': threshold,
+        'hist_counts': counts.counts,
+        'hist_edges': edges,
+        'n_victims': n_victims,
+        'n_survivors': n_survivors,
+        'avg_pdg_victims': pdg_victims / n_victims,
+        'avg_pdg_survivors': pdg_survivors / n_survivors,
+        'avg_lgi_victims': lgi_victims / n_victims,
+    }
+
+@paper_style('dark_background')
+def generate_monte_carlo_tail_risk(N=10000, seed=42, workers=None, block_size=1_000_000, cache=None,
+                                   streaming=False):
+    # 1. Dark Theme (applied by @paper_style for the duration of the call)
     
-    # 3. Define "Death Threshold" (The Tail)
-    # We identify the top 5% most critical cases as the "Lethal Tail"
-    threshold = np.percentile(lethality_index, 95)
-    
-    # Filter Data
-    survivors = lethality_index[lethality_index < threshold]
-    victims = lethality_index[lethality_index >= threshold]
+    # 2. Simulation Parameters
+    # Cohorts are drawn in blocks on a process pool, each with its own seeded Generator
+    # Streaming mode: national-scale N in one pass with bounded memory (sketch + histograms)
+    if streaming:
+        stats = stream_population_statistics(N, 0.95, seed, workers, block_size)
+        threshold = stats['threshold']
+        centers = 0.5 * (stats['hist_edges'][1:] + stats['hist_edges'][:-1])
+        occupied = np.flatnonzero(stats['hist_counts'])
+        lo, hi = stats['hist_edges'][occupied[0]], stats['hist_edges'][occupied[-1] + 1]
+        victims_mean = stats['avg_lgi_victims']
+        avg_pdg_victims, avg_pdg_survivors = stats['avg_pdg_victims'], stats['avg_pdg_survivors']
+    else:
+        # (memory-mapped from the cache on repeat runs)
+        population = cached(cache, 'covid_population_beta', dict(a=2, b=5, block_size=block_size), seed, N,
+                            lambda: np.hstack(run_blocks(_population_block, N, seed, block_size=block_size,
+                                                         workers=workers)))
+        pdg_scores, arf_scores, isg_scores = population
+        
+        # Calculate Lethality Index (LGI)
+        # Formula: LGI = PDG * ARF * ISG
+        lethality_index = pdg_scores * arf_scores * isg_scores
+        
+        # 3. Define "Death Threshold" (The Tail)
+        # We identify the top 5% most critical cases as the "Lethal Tail"
+        threshold = np.percentile(lethality_index, 95)
+        
+        # Filter Data
+        survivors = lethality_index[lethality_index < threshold]
+        victims = lethality_index[lethality_index >= threshold]
+        victims_mean = np.mean(victims)
+        
+        # Data Insight (proving the PDG theory)
+        avg_pdg_victims = np.mean(pdg_scores[lethality_index >= threshold])
+        avg_pdg_survivors = np.mean(pdg_scores[lethality_index < threshold])
     
     # 4. Plotting
     fig, ax = plt.subplots(figsize=(12, 7))
     
-    # Plot Survivors (Green)
-    ax.hist(survivors, bins=50, color='#00cc66', alpha=0.6, label='Recovered Population (Mild Symptoms)')
-    
-    # Plot Victims (Red - The Tail)
-    ax.hist(victims, bins=10, color='#ff3333', alpha=0.9, label='Silent Victims (Lethal Outcome)')
+    if streaming:
+        # Fine histogram re-binned into the same 50 / 10 bars as the dense plot
+        survivor_bins = centers < threshold
+        ax.hist(centers[survivor_bins], bins=np.linspace(lo, threshold, 51), weights=stats['hist_counts'][survivor_bins],
+                color='#00cc66', alpha=0.6, label='Recovered Population (Mild Symptoms)')
+        ax.hist(centers[~survivor_bins], bins=np.linspace(threshold, hi, 11), weights=stats['hist_counts'][~survivor_bins],
+                color='#ff3333', alpha=0.9, label='Silent Victims (Lethal Outcome)')
+    else:
+        # Plot Survivors (Green)
+        ax.hist(survivors, bins=50, color='#00cc66', alpha=0.6, label='Recovered Population (Mild Symptoms)')
+        
+        # Plot Victims (Red - The Tail)
+        ax.hist(victims, bins=10, color='#ff3333', alpha=0.9, label='Silent Victims (Lethal Outcome)')
     
     # 5. Styling & Annotations
     ax.set_title('Monte Carlo Simulation: Identification of "Silent Victims"', fontsize=22, fontweight='bold', pad=20, color='white')
     ax.set_xlabel('Calculated Lethality Risk Index (LGI)', fontsize=12, color='#dddddd')
-    ax.set_ylabel('Population Count (N=10,000)', fontsize=12, color='#dddddd')
+    ax.set_ylabel(f'Population Count (N={N:,})', fontsize=12, color='#dddddd')
     
     # Clean spines
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
     ax.tick_params(colors='#bbbbbb')
     
-    # Annotation for the Tail
+    # Annotation for the Tail (heights scale with the population size)
+    scale = N / 10000
     ax.annotate('THE "TAIL RISK"\n(High PDG + Comorbidities)', 
-                xy=(np.mean(victims), 50), 
-                xytext=(np.mean(victims) - 0.05, 300),
+                xy=(victims_mean, 50 * scale), 
+                xytext=(victims_mean - 0.05, 300 * scale),
                 arrowprops=dict(facecolor='white', arrowstyle='->', lw=1.5),
                 fontsize=11, color='white', fontweight='bold', ha='center')
 
     # Data Insight Box (proving the PDG theory)
-    avg_pdg_victims = np.mean(pdg_scores[lethality_index >= threshold])
-    avg_pdg_survivors = np.mean(pdg_scores[lethality_index < threshold])
-    
     stats_text = (
         f"DATA INSIGHT:\n"
         f"• Survivor Avg PDG: {avg_pdg_survivors:.2f} (Healthy Gums)\n"
@@ -91,4 +184,4 @@ def generate_monte_carlo_tail_risk():
     plt.show()
 
 if __name__ == "__main__":
-    generate_monte_carlo_tail_risk()
+    generate_monte_carlo_tail_risk(cache=SimulationCache())
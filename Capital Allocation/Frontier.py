@@ -1,18 +1,73 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.optimize as sco
-import matplotlib.lines as mlines
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.covariance import as_covariance
+from zyllica.frontier import efficient_frontier, portfolio_return, portfolio_volatility, resampled_frontier
+from zyllica.lazy import lazy_import
+from zyllica.parallel import run_blocks
+from zyllica.pipeline import Pipeline, StageStore
+from zyllica.style import paper_style
+from zyllica.trace import stage, traced
+
+plt = lazy_import('matplotlib.pyplot')
+mlines = lazy_import('matplotlib.lines')
 
 # ----------------------------------------------------------------------------------
-# CONFIGURATION (Dark Mode - High Contrast)
+# CONFIGURATION (Dark Mode - High Contrast, applied while each figure function runs)
 # ----------------------------------------------------------------------------------
-plt.style.use('dark_background')
+PLOT_STYLE = 'dark_background'
 
-def generate_perfected_plots():
-    # 1. DATA SETUP
-    projects = ['Alpha (Core)', 'Beta (Cloud)', 'Gamma (AI)', 'Delta (Asia)', 'Epsilon (Security)']
-    n_assets = len(projects)
-    
+# ----------------------------------------------------------------------------------
+# RANDOM PORTFOLIO CLOUD (Batched)
+# ----------------------------------------------------------------------------------
+def _random_portfolios_block(rng, n, mean_returns, cov_matrix, rf):
+    # Uniform weights on the simplex: one [n x assets] Dirichlet matrix
+    w = rng.dirichlet(np.ones(len(mean_returns)), n)
+    all_ret = w @ mean_returns
+    all_vol = np.sqrt(as_covariance(cov_matrix).batch_variance(w)) # dense matrix or O(n k) factor model
+    all_sharpe = (all_ret - rf) / all_vol
+    return np.vstack([all_vol, all_ret, all_sharpe])
+
+def _density_block(rng, n, mean_returns, cov_matrix, rf, vol_edges, ret_edges):
+    # Reduce the block to a 2D raster: portfolio counts and summed Sharpe per (vol, ret) bin
+    all_vol, all_ret, all_sharpe = _random_portfolios_block(rng, n, mean_returns, cov_matrix, rf)
+    counts = np.histogram2d(all_vol, all_ret, bins=(vol_edges, ret_edges))[0]
+    sharpe_sum = np.histogram2d(all_vol, all_ret, bins=(vol_edges, ret_edges), weights=all_sharpe)[0]
+    return counts, sharpe_sum
+
+def random_portfolio_density(mean_returns, cov_matrix, rf, num_ports, bins=(400, 300), seed=42,
+                             workers=None, block_size=1_000_000):
+    """Binned cloud of `num_ports` random long-only portfolios.
+
+    Memory is O(bins) whatever `num_ports` is: each block is rasterized by its
+    worker and the rasters are summed. Bin ranges are known in advance since a
+    long-only portfolio's return lies between the asset returns and its
+    volatility below the largest asset volatility. `cov_matrix` may be a dense
+    matrix or any `zyllica.covariance.Covariance` (e.g. a factor model).
+    """
+    vol_edges = np.linspace(0, np.sqrt(np.max(as_covariance(cov_matrix).diagonal())), bins[0] + 1)
+    ret_edges = np.linspace(np.min(mean_returns), np.max(mean_returns), bins[1] + 1)
+    blocks = run_blocks(_density_block, num_ports, seed, block_size=block_size, workers=workers,
+                        args=(mean_returns, cov_matrix, rf, vol_edges, ret_edges))
+    counts = sum(block[0] for block in blocks)
+    sharpe_sum = sum(block[1] for block in blocks)
+    mean_sharpe = np.ma.masked_where(counts == 0, sharpe_sum / np.maximum(counts, 1))
+    return {'counts': counts, 'mean_sharpe': mean_sharpe, 'vol_edges': vol_edges, 'ret_edges': ret_edges}
+
+# ----------------------------------------------------------------------------------
+# STAGES (inputs -> optimization / cloud): with a StageStore each stage is memoized on disk
+# and reruns only when its own code, settings or upstream values change
+# ----------------------------------------------------------------------------------
+FRONTIER_STAGES = Pipeline('frontier')
+
+PROJECTS = ['Alpha (Core)', 'Beta (Cloud)', 'Gamma (AI)', 'Delta (Asia)', 'Epsilon (Security)']
+
+# 1. DATA SETUP
+@FRONTIER_STAGES.stage('inputs')
+def _inputs_stage():
     # Expected Returns & Volatility
     mean_returns = np.array([0.08, 0.12, 0.25, 0.18, 0.00]) 
     volatilities = np.array([0.05, 0.10, 0.35, 0.25, 0.05])
@@ -27,64 +82,85 @@ def generate_perfected_plots():
     ])
     
     cov_matrix = np.outer(volatilities, volatilities) * corr_matrix
-    rf = 0.03 
+    return dict(mean_returns=mean_returns, cov_matrix=cov_matrix, rf=0.03)
 
-    # ----------------------------------------------------------------------------------
-    # OPTIMIZATION
-    # ----------------------------------------------------------------------------------
-    def portfolio_volatility(weights):
-        return np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-    
-    def portfolio_return(weights):
-        return np.sum(mean_returns * weights)
-    
-    def min_sharpe(weights):
-        return -(portfolio_return(weights) - rf) / portfolio_volatility(weights)
-    
-    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-    bounds = tuple((0, 1) for _ in range(n_assets))
-    init_guess = n_assets * [1. / n_assets,]
-    
-    opt_result = sco.minimize(min_sharpe, init_guess, method='SLSQP', bounds=bounds, constraints=constraints)
-    opt_weights = opt_result.x
+# 2. OPTIMIZATION
+@FRONTIER_STAGES.stage('frontier')
+def _frontier_stage(inputs, n_points=200):
+    # Whole frontier traced with analytic gradients (each target warm-started from the previous one)
+    return efficient_frontier(inputs['mean_returns'], inputs['cov_matrix'], inputs['rf'], n_points=n_points)
+
+@FRONTIER_STAGES.stage('resampled')
+def _resampled_stage(inputs, n_resamples=500, n_obs=60, seed=42, workers=None):
+    # Resampled (Michaud) mode: optimum averaged over re-estimated inputs, with its weight dispersion
+    return resampled_frontier(inputs['mean_returns'], inputs['cov_matrix'], inputs['rf'], n_obs=n_obs,
+                              n_resamples=n_resamples, seed=seed, workers=workers)
+
+# 3. RANDOM PORTFOLIO CLOUD
+@FRONTIER_STAGES.stage('cloud', code=(random_portfolio_density, _density_block, _random_portfolios_block))
+def _cloud_stage(inputs, num_ports=5000, density=False, seed=42, workers=None, block_size=1_000_000):
+    # Random portfolios drawn in blocks on a process pool; large clouds are reduced to a binned
+    # raster (mean Sharpe per cell) instead of one point per portfolio
+    mean_returns, cov_matrix, rf = inputs['mean_returns'], inputs['cov_matrix'], inputs['rf']
+    if density:
+        return random_portfolio_density(mean_returns, cov_matrix, rf, num_ports, seed=seed,
+                                        workers=workers, block_size=block_size)
+    blocks = run_blocks(_random_portfolios_block, num_ports, seed, block_size=block_size,
+                        workers=workers, args=(mean_returns, cov_matrix, rf))
+    all_vol, all_ret, all_sharpe = np.hstack(blocks)
+    return dict(vol=all_vol, ret=all_ret, sharpe=all_sharpe)
+
+@traced
+@paper_style(PLOT_STYLE)
+def generate_perfected_plots(num_ports=5000, seed=42, workers=None, block_size=1_000_000, density=None,
+                             resample=False, n_resamples=500, n_obs=60, store=None):
+    if density is None:
+        density = num_ports > 50_000
+    targets = ['frontier', 'cloud'] + (['resampled'] if resample else [])
+    outputs = FRONTIER_STAGES.run(targets, store=store, num_ports=num_ports, density=density, seed=seed,
+                                  workers=workers, block_size=block_size, n_resamples=n_resamples, n_obs=n_obs)
+    mean_returns, cov_matrix = outputs['inputs']['mean_returns'], outputs['inputs']['cov_matrix']
+    frontier, cloud = outputs['frontier'], outputs['cloud']
+    opt_weights = frontier['tangency']['weights']
+    if resample:
+        resampled = outputs['resampled']
     
     # CEO's Intuition Portfolio
     ceo_weights = np.array([0.30, 0.066, 0.50, 0.066, 0.066]) 
     
     # Calculate Metrics
-    opt_ret = portfolio_return(opt_weights)
-    opt_vol = portfolio_volatility(opt_weights)
-    ceo_ret = portfolio_return(ceo_weights)
-    ceo_vol = portfolio_volatility(ceo_weights)
+    opt_ret = frontier['tangency']['ret']
+    opt_vol = frontier['tangency']['vol']
+    ceo_ret = portfolio_return(ceo_weights, mean_returns)
+    ceo_vol = portfolio_volatility(ceo_weights, cov_matrix)
 
     # ----------------------------------------------------------------------------------
     # PLOT 1: THE EFFICIENT FRONTIER (Fixed Labels)
     # ----------------------------------------------------------------------------------
     fig_ef, ax_ef = plt.subplots(figsize=(14, 8))
     
-    # Background Cloud
-    num_ports = 5000
-    all_vol = np.zeros(num_ports)
-    all_ret = np.zeros(num_ports)
-    all_sharpe = np.zeros(num_ports)
-    
-    np.random.seed(42)
-    for i in range(num_ports):
-        w = np.random.random(n_assets)
-        w /= np.sum(w)
-        all_ret[i] = np.sum(mean_returns * w)
-        all_vol[i] = np.sqrt(np.dot(w.T, np.dot(cov_matrix, w)))
-        all_sharpe[i] = (all_ret[i] - rf) / all_vol[i]
+    # Background Cloud (raster of mean Sharpe per cell for large clouds, else one marker per portfolio)
+    if density:
+        extent = [cloud['vol_edges'][0], cloud['vol_edges'][-1], cloud['ret_edges'][0], cloud['ret_edges'][-1]]
+        sc = ax_ef.imshow(cloud['mean_sharpe'].T, extent=extent, origin='lower', aspect='auto',
+                          cmap='viridis', alpha=0.6, interpolation='nearest')
+    else:
+        sc = ax_ef.scatter(cloud['vol'], cloud['ret'], c=cloud['sharpe'], cmap='viridis', alpha=0.4, s=15, edgecolors='none')
         
-    sc = ax_ef.scatter(all_vol, all_ret, c=all_sharpe, cmap='viridis', alpha=0.4, s=15, edgecolors='none')
     cbar = plt.colorbar(sc, ax=ax_ef)
     cbar.set_label('Sharpe Ratio (Efficiency)', rotation=270, labelpad=20, color='#dddddd')
     cbar.ax.yaxis.set_tick_params(color='#dddddd')
     plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color='#bbbbbb')
     
+    # Frontier Curve
+    ax_ef.plot(frontier['volatilities'], frontier['returns'], color='#00ff00', linestyle='--', linewidth=2, alpha=0.8, label='Efficient Frontier')
+    
     # Markers
     ax_ef.scatter(ceo_vol, ceo_ret, color='#ff3333', s=250, marker='X', label="CEO's Intuition", zorder=10, edgecolors='white', linewidth=1.5)
     ax_ef.scatter(opt_vol, opt_ret, color='#00ff00', s=300, marker='*', label="Algorithmic Optimal", zorder=10, edgecolors='white', linewidth=1.5)
+    if resample:
+        ax_ef.plot(resampled['volatilities'], resampled['returns'], color='#00ccff', linestyle=':', linewidth=2, label='Resampled Frontier')
+        ax_ef.scatter(resampled['tangency']['vol'], resampled['tangency']['ret'], color='#00ccff', s=200, marker='D', label="Resampled Optimal", zorder=10, edgecolors='white', linewidth=1.5)
     
     # --- FIXED ANNOTATIONS ---
     
@@ -119,8 +195,10 @@ def generate_perfected_plots():
     for text in legend.get_texts(): text.set_color("white")
     
     plt.subplots_adjust(bottom=0.15)
-    plt.savefig('efficient_frontier_perfect.png')
-    plt.show()
+    with stage('savefig', file='efficient_frontier_perfect.png'):
+        plt.savefig('efficient_frontier_perfect.png')
+    with stage('show'):
+        plt.show()
 
     # ----------------------------------------------------------------------------------
     # PLOT 2: DUMBBELL PLOT (Maintained as requested)
@@ -129,9 +207,9 @@ def generate_perfected_plots():
     
     ceo_pct = ceo_weights * 100
     opt_pct = opt_weights * 100
-    y_pos = np.arange(len(projects))
+    y_pos = np.arange(len(PROJECTS))
     
-    for i in range(len(projects)):
+    for i in range(len(PROJECTS)):
         ax.hlines(y=i, xmin=min(ceo_pct[i], opt_pct[i]), xmax=max(ceo_pct[i], opt_pct[i]), 
                   color='#666666', alpha=0.6, linewidth=3, zorder=1)
         
@@ -143,8 +221,12 @@ def generate_perfected_plots():
 
     ax.scatter(ceo_pct, y_pos, color='#ff5555', s=200, label="CEO's Intuition", zorder=3, edgecolors='white', marker='X')
     ax.scatter(opt_pct, y_pos, color='#00ff00', s=200, label="Algorithmic Optimal", zorder=3, edgecolors='white', marker='o')
+    if resample:
+        res_pct = resampled['tangency']['weights'] * 100
+        band = np.abs(resampled['tangency']['weights_ci'] * 100 - res_pct)
+        ax.errorbar(res_pct, y_pos - 0.25, xerr=band, fmt='D', color='#00ccff', markersize=8, capsize=5, label="Resampled Optimal (90% band)", zorder=3)
     
-    for i in range(len(projects)):
+    for i in range(len(PROJECTS)):
         ax.annotate(f'{ceo_pct[i]:.1f}%', xy=(ceo_pct[i], i), xytext=(0, -25), textcoords="offset points",
                     ha='center', va='top', color='#ffaaaa', fontsize=10, fontweight='bold',
                     bbox=dict(boxstyle="round,pad=0.2", fc="#222222", ec="none", alpha=0.7))
@@ -153,13 +235,13 @@ def generate_perfected_plots():
                     ha='center', va='bottom', color='#aaffdd', fontsize=10, fontweight='bold',
                     bbox=dict(boxstyle="round,pad=0.2", fc="#222222", ec="none", alpha=0.7))
         
-        if "Delta" in projects[i]:
+        if "Delta" in PROJECTS[i]:
              ax.annotate('REJECTED', xy=(opt_pct[i], i), xytext=(opt_pct[i] + 8, i),
                         arrowprops=dict(facecolor='#ff5555', arrowstyle='->'),
                         ha='left', va='center', color='#ff5555', fontsize=10, fontweight='bold')
 
     ax.set_yticks(y_pos)
-    ax.set_yticklabels(projects, fontsize=14, color='white', fontweight='bold')
+    ax.set_yticklabels(PROJECTS, fontsize=14, color='white', fontweight='bold')
     ax.set_xlabel('Capital Allocation (% of Budget)', fontsize=13, color='#cccccc')
     ax.set_title('Strategic Shift: From Intuition to Algorithm', fontsize=22, fontweight='bold', color='white', pad=25)
     
@@ -179,8 +261,10 @@ def generate_perfected_plots():
     
     plt.tight_layout()
     plt.subplots_adjust(bottom=0.15)
-    plt.savefig('dumbbell_allocation_final.png')
-    plt.show()
+    with stage('savefig', file='dumbbell_allocation_final.png'):
+        plt.savefig('dumbbell_allocation_final.png')
+    with stage('show'):
+        plt.show()
 
 if __name__ == "__main__":
-    generate_perfected_plots()
+    generate_perfected_plots(store=StageStore())
@@ -1,22 +1,31 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.lazy import lazy_import
+from zyllica.style import paper_style
+
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
 
 # ----------------------------------------------------------------------------------
 # CONFIGURATION (Dark Mode - Final English Edition)
 # ----------------------------------------------------------------------------------
-plt.style.use('dark_background')
-
-# Customizing rcParams for a more spacious, elegant look
-plt.rcParams['figure.dpi'] = 100
-plt.rcParams['axes.spines.top'] = False
-plt.rcParams['axes.spines.right'] = False
-plt.rcParams['axes.spines.left'] = False 
-plt.rcParams['axes.spines.bottom'] = True
-plt.rcParams['axes.grid'] = True
-plt.rcParams['grid.alpha'] = 0.2
-plt.rcParams['grid.linestyle'] = '--'
+# Customizing rcParams for a more spacious, elegant look (applied while each figure function runs)
+PLOT_STYLE = ['dark_background', {
+    'figure.dpi': 100,
+    'axes.spines.top': False,
+    'axes.spines.right': False,
+    'axes.spines.left': False,
+    'axes.spines.bottom': True,
+    'axes.grid': True,
+    'grid.alpha': 0.2,
+    'grid.linestyle': '--',
+}]
 
+@paper_style(PLOT_STYLE)
 def generate_final_english_graphs():
     # 1. DATA
     countries = ['Spain', 'Italy', 'Switzerland', 'USA', 'Germany', 'France', 'South Korea', 'Brazil', 'Colombia', 'Russia']
@@ -1,12 +1,22 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import beta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.beta_mixture import beta_mixture_pdf, fit_beta_mixture
+from zyllica.credit import simulate_credit_losses
+from zyllica.irb import IRBBook
+from zyllica.lazy import lazy_import
+from zyllica.parallel import run_blocks
+from zyllica.pipeline import Pipeline, StageStore
+from zyllica.style import paper_style
+
+plt = lazy_import('matplotlib.pyplot')
 
 # ----------------------------------------------------------------------------------
 # CONFIGURATION (Professional Financial Gray Style)
 # ----------------------------------------------------------------------------------
-plt.rcdefaults()
 
 # Palette: "Slate & Teal"
 BG_COLOR = '#F5F5F5'        
@@ -19,26 +29,120 @@ COLOR_RISK = '#C0392B'
 COLOR_NEUTRAL = '#34495E'   
 COLOR_BAR_START = '#95A5A6' 
 
-# Style Parameters
-plt.rcParams['figure.dpi'] = 150
-plt.rcParams['font.family'] = 'serif'
-plt.rcParams['font.serif'] = ['DejaVu Serif', 'Georgia', 'Times New Roman']
-plt.rcParams['axes.spines.top'] = False
-plt.rcParams['axes.spines.right'] = False
-plt.rcParams['axes.spines.left'] = False 
-plt.rcParams['axes.spines.bottom'] = True
-plt.rcParams['axes.grid'] = True
-plt.rcParams['grid.color'] = GRID_COLOR
-plt.rcParams['grid.linewidth'] = 1.5
-plt.rcParams['grid.alpha'] = 1.0 
-plt.rcParams['axes.facecolor'] = BG_COLOR
-plt.rcParams['figure.facecolor'] = BG_COLOR
-plt.rcParams['text.color'] = TEXT_COLOR
-plt.rcParams['axes.labelcolor'] = TEXT_COLOR
-plt.rcParams['xtick.color'] = TEXT_COLOR
-plt.rcParams['ytick.color'] = TEXT_COLOR
-
-def generate_risk_architecture_plots_final_v19():
+# Style Parameters (matplotlib defaults plus these, applied while each figure function runs)
+PLOT_STYLE = ['default', {
+    'figure.dpi': 150,
+    'font.family': 'serif',
+    'font.serif': ['DejaVu Serif', 'Georgia', 'Times New Roman'],
+    'axes.spines.top': False,
+    'axes.spines.right': False,
+    'axes.spines.left': False,
+    'axes.spines.bottom': True,
+    'axes.grid': True,
+    'grid.color': GRID_COLOR,
+    'grid.linewidth': 1.5,
+    'grid.alpha': 1.0,
+    'axes.facecolor': BG_COLOR,
+    'figure.facecolor': BG_COLOR,
+    'text.color': TEXT_COLOR,
+    'axes.labelcolor': TEXT_COLOR,
+    'xtick.color': TEXT_COLOR,
+    'ytick.color': TEXT_COLOR,
+}]
+
+# Capital levers of the waterfall (each step keeps the previous ones)
+DOWNTURN_LGD_ADDON = 0.10   # Traditional LGD: flat static average plus a downturn add-on
+TRADITIONAL_CCF = 1.0       # Traditional EAD: undrawn limits assumed fully drawn at default
+PREDICTED_CCF = 0.45        # EAD Precision: behavioural credit conversion factor
+BBM_PD_REDUCTION = 0.35     # BBM Intervention: PD cut on the riskiest decile of the book
+ASSET_CORRELATION = 0.15
+SEGMENT_ASSET_CLASSES = np.array(['retail_other', 'corporate', 'corporate'])  # Basel IRB class per segment
+
+def _beta_block(rng, n, a, b):
+    return rng.beta(a, b, n)
+
+def _loan_book_block(rng, n):
+    # Synthetic loan-level book: Retail / SME / Corporate segments with lognormal PDs and balances
+    segment = rng.choice(3, size=n, p=[0.6, 0.3, 0.1])
+    pd = np.clip(rng.lognormal(np.log([0.03, 0.02, 0.01])[segment], 0.6), 1e-4, 0.5)
+    drawn = rng.lognormal(np.log([10.0, 150.0, 1000.0])[segment], 0.8)
+    undrawn = drawn * rng.uniform(0.1, 0.6, n)
+    return np.vstack([segment, pd, drawn, undrawn])
+
+def capital_waterfall(lgd_fit, n_loans=10_000, n_scenarios=10_000, seed=42, workers=None, block_size=1_000_000,
+                      capital='economic'):
+    """Capital after each lever, indexed to Current Reserves = 100.
+
+    ``capital='economic'`` simulates 99.9% economic capital (one-factor Vasicek);
+    ``'regulatory'`` prices the same levers with the Basel IRB formula as
+    incremental what-ifs on one loan-level book.
+    """
+    # Independent streams for the book and the loss scenarios (rebuilt per step, so every step
+    # sees the same draws: common random numbers isolate the effect of each lever)
+    def stream(k):
+        return np.random.SeedSequence(seed, spawn_key=(k,))
+
+    segment, pd, drawn, undrawn = np.hstack(run_blocks(_loan_book_block, n_loans, stream(0), block_size, workers))
+    segment = segment.astype(int)
+    static_lgd = lgd_fit['weights'] @ lgd_fit['means']
+    downturn_lgd = min(static_lgd + DOWNTURN_LGD_ADDON, 1.0)
+    riskiest = np.flatnonzero(pd >= np.quantile(pd, 0.9))
+    bbm_pd = pd.copy()
+    bbm_pd[riskiest] *= 1 - BBM_PD_REDUCTION
+
+    if capital == 'regulatory':
+        book = IRBBook(pd, downturn_lgd, drawn + TRADITIONAL_CCF * undrawn,
+                       asset_class=SEGMENT_ASSET_CLASSES[segment], segments=segment)
+        levels = [book.total_capital]
+        levels.append(book.apply(lgd=static_lgd)['capital'])                              # LGD Optim.
+        levels.append(book.apply(ead=drawn + PREDICTED_CCF * undrawn)['capital'])         # EAD Precision
+        levels.append(book.apply(riskiest, pd=bbm_pd[riskiest])['capital'])               # BBM Intervention
+        return 100 * np.array(levels) / levels[0]
+
+    levers = [
+        (pd, drawn + TRADITIONAL_CCF * undrawn, downturn_lgd),   # Current Reserves
+        (pd, drawn + TRADITIONAL_CCF * undrawn, lgd_fit),        # LGD Optim.
+        (pd, drawn + PREDICTED_CCF * undrawn, lgd_fit),          # EAD Precision
+        (bbm_pd, drawn + PREDICTED_CCF * undrawn, lgd_fit),      # BBM Intervention
+    ]
+    economic = np.array([
+        simulate_credit_losses(step_pd, step_ead, step_lgd, rho=ASSET_CORRELATION, segments=segment,
+                               n_scenarios=n_scenarios, seed=stream(1), workers=workers)['economic_capital']
+        for step_pd, step_ead, step_lgd in levers
+    ])
+    return 100 * economic / economic[0]
+
+# ----------------------------------------------------------------------------------
+# STAGES (simulate -> fit -> capital): with a StageStore each stage is memoized on disk
+# and reruns only when its own code, settings or upstream values change
+# ----------------------------------------------------------------------------------
+EAD_STAGES = Pipeline('ead')
+
+@EAD_STAGES.stage('lgd_data', code=(_beta_block,))
+def _lgd_data_stage(seed=42, workers=None, block_size=1_000_000):
+    # Independent streams for each sub-population, drawn in blocks on a process pool
+    cured_seed, loss_seed = np.random.SeedSequence(seed).spawn(2)
+    data_cured = np.concatenate(run_blocks(_beta_block, 4000, cured_seed, block_size, workers, args=(0.5, 5)))
+    data_loss = np.concatenate(run_blocks(_beta_block, 3000, loss_seed, block_size, workers, args=(5, 0.5)))
+    return np.concatenate([data_cured, data_loss])
+
+@EAD_STAGES.stage('lgd_fit')
+def _lgd_fit_stage(lgd_data):
+    # Two-component Beta mixture (cure mode + write-off mode) fitted by vectorized EM
+    return fit_beta_mixture(lgd_data, n_components=2)
+
+@EAD_STAGES.stage('capital_levels', code=(capital_waterfall, _loan_book_block))
+def _capital_levels_stage(lgd_fit, n_loans=10_000, n_scenarios=10_000, seed=42, workers=None,
+                          block_size=1_000_000, capital='economic'):
+    return capital_waterfall(lgd_fit, n_loans, n_scenarios, seed, workers, block_size, capital)
+
+@paper_style(PLOT_STYLE)
+def generate_risk_architecture_plots_final_v19(seed=42, workers=None, block_size=1_000_000, n_loans=10_000,
+                                               n_scenarios=10_000, capital='economic', store=None):
+    outputs = EAD_STAGES.run(store=store, seed=seed, workers=workers, block_size=block_size, n_loans=n_loans,
+                             n_scenarios=n_scenarios, capital=capital)
+    lgd_data, lgd_fit = outputs['lgd_data'], outputs['lgd_fit']
+
     print("Generando Gráfica 1A: The Bimodal Reality...")
     
     # ----------------------------------------------------------------------------------
@@ -47,11 +151,6 @@ def generate_risk_architecture_plots_final_v19():
     fig, ax = plt.subplots(figsize=(12, 7))
     ax.set_facecolor(BG_COLOR)
     
-    np.random.seed(42)
-    data_cured = np.random.beta(0.5, 5, 4000) 
-    data_loss = np.random.beta(5, 0.5, 3000) 
-    lgd_data = np.concatenate([data_cured, data_loss])
-    
     ax.hist(lgd_data, bins=60, density=True, color=COLOR_MAIN, edgecolor=BG_COLOR, alpha=0.8)
     
     ax.annotate('Dominant Mode: Cures\n(Near 0% Loss)', 
@@ -88,10 +187,12 @@ def generate_risk_architecture_plots_final_v19():
     avg_lgd = np.mean(lgd_data)
     ax.axvline(avg_lgd, color=COLOR_RISK, linewidth=2.5, linestyle='--', label=f'Static Average ({avg_lgd:.0%})')
     
+    # Two-component Beta mixture (cure mode + write-off mode, from the lgd_fit stage)
     x = np.linspace(0, 1, 200)
-    a, b, loc, scale = beta.fit(lgd_data)
-    p = beta.pdf(x, a, b, loc, scale)
-    ax.plot(x, p, color=COLOR_MAIN, linewidth=3.5, label='Beta Regression Fit')
+    p = beta_mixture_pdf(x, lgd_fit)
+    w_cure, w_loss = lgd_fit['weights']
+    ax.plot(x, p, color=COLOR_MAIN, linewidth=3.5,
+            label=f'Beta Mixture Fit ({w_cure:.0%} Cures / {w_loss:.0%} Write-offs)')
     
     ax.annotate('THE "DANGER ZONE"\n(Average assumes losses here,\nbut reality is binary)', 
                 xy=(avg_lgd, 0.8),          
@@ -120,14 +221,17 @@ def generate_risk_architecture_plots_final_v19():
     ax.set_facecolor(BG_COLOR)
     
     steps = ['Current\nReserves', 'LGD\nOptim.', 'EAD\nPrecision', 'BBM\nIntervention', 'Optimized\nCapital']
-    values = [100, -18, -12, -15, 55] 
+    # Steps simulated by the credit-loss model (economic capital after each lever, base 100)
+    levels = [float(level) for level in np.round(outputs['capital_levels'], 1)]
+    values = [100] + [round(after - before, 1) for before, after in zip(levels, levels[1:])] + [levels[-1]]
     running_total = 0
     
     for i, (step, val) in enumerate(zip(steps, values)):
-        color = COLOR_BAR_START if i == 0 else (COLOR_MAIN if val < 0 else COLOR_NEUTRAL)
+        # Model-derived steps may go either way: releases in teal, increases in red
+        color = COLOR_BAR_START if i == 0 else (COLOR_MAIN if val < 0 else COLOR_RISK)
         if i == len(steps)-1: color = COLOR_NEUTRAL
         
-        bottom = running_total if i == 0 or i == len(steps)-1 else running_total + val
+        bottom = running_total if i == 0 or i == len(steps)-1 else min(running_total, running_total + val)
         height = val if i == 0 or i == len(steps)-1 else abs(val)
         if i == len(steps)-1: bottom = 0
         
@@ -136,23 +240,23 @@ def generate_risk_architecture_plots_final_v19():
         if i > 0:
             ax.plot([i-1.3, i+0.3], [running_total, running_total], color=TEXT_COLOR, linestyle='-', linewidth=1, alpha=0.3, zorder=1)
             
-        label_text = f"{val}" if i == 0 or i == len(steps)-1 else f"-{abs(val)}"
+        label_text = f"{val:g}" if i == 0 or i == len(steps)-1 else f"{val:+.1f}"
         label_y = bottom + height + 2 
         if val < 0: label_y = bottom - 5
         
         ax.text(i, label_y, label_text, ha='center', va='center', color=TEXT_COLOR, fontweight='bold', fontsize=11)
         
-        if val < 0: running_total += val
-        else: running_total = val
+        if i == 0 or i == len(steps)-1: running_total = val
+        else: running_total += val
     
-    ax.annotate('45% Capital Release\n(Direct EBITDA Impact)', 
-                xy=(3.75, 20),       
-                xytext=(2.0, 20),    
+    ax.annotate(f'{100 - levels[-1]:.1f}% Capital Release\n(Direct EBITDA Impact)', 
+                xy=(3.75, levels[-1] * 0.36),       
+                xytext=(2.0, levels[-1] * 0.36),    
                 arrowprops=dict(edgecolor=COLOR_NEUTRAL, facecolor=COLOR_NEUTRAL, arrowstyle='-|>', lw=1.5), 
                 ha='center', va='center', color=COLOR_NEUTRAL, fontweight='bold', fontsize=12,
                 bbox=dict(boxstyle="square,pad=0.4", fc="white", ec="none", alpha=0.7))
                 
-    ax.set_title('Figure 2. Economic Capital Optimization Waterfall', fontsize=16, fontweight='bold', pad=20, loc='left')
+    ax.set_title(f'Figure 2. {"Regulatory (IRB)" if capital == "regulatory" else "Economic"} Capital Optimization Waterfall', fontsize=16, fontweight='bold', pad=20, loc='left')
     ax.set_ylabel('Index (Base 100 = Current Reserves)', fontsize=12, labelpad=10)
     ax.set_xticks(range(len(steps)))
     ax.set_xticklabels(steps, fontsize=11)
@@ -161,7 +265,9 @@ def generate_risk_architecture_plots_final_v19():
     # Increased bottom margin to make space for the note
     plt.subplots_adjust(bottom=0.2)
     # Placed note lower (y=0.05) to clear x-axis labels
-    plt.figtext(0.1, 0.05, "Source: Internal Methodology. Values normalized to base 100.", ha="left", fontsize=9, color='#7f8c8d', style='italic')
+    source = (f"Basel IRB risk-weight formula over {n_loans:,} loans" if capital == 'regulatory' else
+              f"One-factor Vasicek simulation, 99.9% economic capital ({n_loans:,} loans x {n_scenarios:,} scenarios)")
+    plt.figtext(0.1, 0.05, f"Source: {source}. Values normalized to base 100.", ha="left", fontsize=9, color='#7f8c8d', style='italic')
     
     plt.savefig('graph2_gray.png')
     plt.show()
@@ -174,13 +280,13 @@ def generate_risk_architecture_plots_final_v19():
     fig, ax = plt.subplots(figsize=(12, 8))
     ax.set_facecolor(BG_COLOR)
     
-    np.random.seed(10)
-    capital = np.random.normal(50, 10, 200)
-    return_val = capital * 0.4 + np.random.normal(0, 3, 200)
+    rng_peers = np.random.default_rng(10)
+    peer_capital = rng_peers.normal(50, 10, 200)
+    return_val = peer_capital * 0.4 + rng_peers.normal(0, 3, 200)
     old_cap, old_ret = 70, 25 
     new_cap, new_ret = 45, 38 
     
-    ax.scatter(capital, return_val, c='#95a5a6', alpha=0.5, s=40, label='Industry Peers', edgecolors='white', linewidth=0.5)
+    ax.scatter(peer_capital, return_val, c='#95a5a6', alpha=0.5, s=40, label='Industry Peers', edgecolors='white', linewidth=0.5)
     
     ax.annotate('', xy=(new_cap, new_ret), xytext=(old_cap, old_ret),
                 arrowprops=dict(edgecolor=COLOR_MAIN, arrowstyle='-|>', lw=2.5, mutation_scale=25, connectionstyle="arc3,rad=-0.2"))
@@ -216,4 +322,4 @@ def generate_risk_architecture_plots_final_v19():
     print("¡Todas las gráficas generadas y ajustadas!")
 
 if __name__ == "__main__":
-    generate_risk_architecture_plots_final_v19()
+    generate_risk_architecture_plots_final_v19(store=StageStore())
@@ -1,25 +1,80 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import norm, genpareto, t
+from scipy.special import ndtri
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.cache import SimulationCache, cached
+from zyllica.evt import bootstrap_pot, threshold_sweep
+from zyllica.gpd import fit_mle, pot_es, pot_var
+from zyllica.lazy import lazy_import
+from zyllica.parallel import run_blocks
+from zyllica.pipeline import Pipeline, StageStore
+from zyllica.style import paper_style
+from zyllica.trace import stage, traced
+
+plt = lazy_import('matplotlib.pyplot')
+stats = lazy_import('scipy.stats')  # densities for the plots only
 
 # ----------------------------------------------------------------------------------
-# CONFIGURATION (Dark Mode - High Contrast)
+# CONFIGURATION (Dark Mode - High Contrast, applied while each figure function runs)
 # ----------------------------------------------------------------------------------
-plt.style.use('dark_background')
+PLOT_STYLE = 'dark_background'
 
-def generate_clean_evt_plots():
-    # 1. DATA GENERATION (Simulating Fat-Tailed Market)
-    np.random.seed(42)
-    n = 10000
+def _market_returns_block(rng, n):
     # Student-t (df=3) creates realistic heavy tails
-    data = t.rvs(df=3, size=n) * 0.02 
+    return rng.standard_t(3, n) * 0.02
+
+def simulate_losses(n=10000, seed=42, workers=None, block_size=1_000_000, cache=None):
+    # Drawn in blocks on a process pool, each with its own seeded Generator
+    # (memory-mapped from the cache on repeat runs)
+    data = cached(cache, 'evt_student_t_returns', dict(df=3, scale=0.02, block_size=block_size), seed, n,
+                  lambda: np.concatenate(run_blocks(_market_returns_block, n, seed, block_size=block_size,
+                                                    workers=workers)))
     losses = -data # Convert to positive "loss" magnitude for visualization
-    losses = losses[losses > 0]
-    
-    # 2. CALIBRATION (EVT - Peaks Over Threshold)
+    return losses[losses > 0]
+
+# ----------------------------------------------------------------------------------
+# STAGES (simulate -> fit -> metrics -> plot): with a StageStore each stage is memoized
+# on disk and reruns only when its own code, settings or upstream values change
+# ----------------------------------------------------------------------------------
+EVT_STAGES = Pipeline('evt')
+
+# 1. DATA GENERATION (Simulating Fat-Tailed Market)
+@EVT_STAGES.stage('losses', code=(simulate_losses, _market_returns_block))
+def _losses_stage(n=10000, seed=42, workers=None, block_size=1_000_000, cache=None):
+    return simulate_losses(n, seed, workers, block_size, cache)
+
+# 2. CALIBRATION (EVT - Peaks Over Threshold)
+@EVT_STAGES.stage('tail_fit')
+def _tail_fit_stage(losses):
     u = np.percentile(losses, 95)
     excesses = losses[losses > u] - u
-    xi, loc, sigma = genpareto.fit(excesses, floc=0)
+    gpd_fit = fit_mle(excesses) # Newton MLE (analytic score/Hessian) from PWM start values
+    mu_norm, std_norm = losses.mean(), losses.std() # Gaussian MLE (same as norm.fit)
+    return dict(u=u, xi=gpd_fit['xi'], sigma=gpd_fit['sigma'], n_u=len(excesses), mu_norm=mu_norm, std_norm=std_norm)
+
+# 3. RISK METRICS (VaR, ES and their bootstrap confidence intervals)
+@EVT_STAGES.stage('risk_metrics')
+def _risk_metrics_stage(losses, tail_fit, alpha=0.99, n_boot=1000, seed=42, workers=None):
+    u, xi, sigma = tail_fit['u'], tail_fit['xi'], tail_fit['sigma']
+    var_evt = pot_var(u, xi, sigma, len(losses), tail_fit['n_u'], alpha)
+    # Bootstrap Confidence Intervals (resamples refitted in parallel, threshold re-selected each time)
+    boot = bootstrap_pot(losses, n_boot=n_boot, threshold_quantile=0.95, alpha=alpha, seed=seed, workers=workers)
+    return dict(alpha=alpha, var_normal=tail_fit['mu_norm'] + tail_fit['std_norm'] * ndtri(alpha), var_evt=var_evt,
+                es_evt=pot_es(var_evt, u, xi, sigma), var_ci=boot['ci']['var'], es_ci=boot['ci']['es'])
+
+@EVT_STAGES.stage('sweep')
+def _sweep_stage(losses, method='pwm', workers=None):
+    # Losses sorted once, all candidate thresholds in one pass
+    return threshold_sweep(losses, n_thresholds=300, method=method, workers=workers)
+
+# 4. PLOTS (always rerun; everything upstream comes from the store when unchanged)
+@EVT_STAGES.stage('tail_plots', cache=False)
+def _tail_plots_stage(losses, tail_fit, risk_metrics):
+    u, xi, sigma = tail_fit['u'], tail_fit['xi'], tail_fit['sigma']
+    mu_norm, std_norm = tail_fit['mu_norm'], tail_fit['std_norm']
     
     # ----------------------------------------------------------------------------------
     # PLOT 1: DISTRIBUTION FIT (Fixed Overlaps)
@@ -31,13 +86,12 @@ def generate_clean_evt_plots():
     ax.hist(losses, bins=100, density=True, alpha=0.4, color='#444444', label='Actual Market Losses')
     
     # Gaussian Fit (Blue)
-    mu_norm, std_norm = norm.fit(losses)
-    gaussian_pdf = norm.pdf(tail_range, mu_norm, std_norm)
+    gaussian_pdf = stats.norm.pdf(tail_range, mu_norm, std_norm)
     ax.plot(tail_range, gaussian_pdf, color='#00ccff', linestyle='--', linewidth=2.5, label='Normal Dist. (Gaussian)')
     
     # EVT Fit (Red)
-    prob_exceed_u = len(excesses) / len(losses)
-    gpd_pdf = (genpareto.pdf(tail_range - u, xi, 0, sigma)) * prob_exceed_u
+    prob_exceed_u = tail_fit['n_u'] / len(losses)
+    gpd_pdf = (stats.genpareto.pdf(tail_range - u, xi, 0, sigma)) * prob_exceed_u
     ax.plot(tail_range, gpd_pdf, color='#ff3333', linewidth=3.5, label='EVT (Generalized Pareto)')
     
     # Formatting & Zoom
@@ -68,19 +122,18 @@ def generate_clean_evt_plots():
     plt.figtext(0.5, 0.02, note, ha='center', fontsize=11, color='#aaaaaa', style='italic')
     
     plt.subplots_adjust(bottom=0.15)
-    plt.savefig('evt_tail_fit_clean.png')
-    plt.show()
+    with stage('savefig', file='evt_tail_fit_clean.png'):
+        plt.savefig('evt_tail_fit_clean.png')
+    with stage('show'):
+        plt.show()
 
     # ----------------------------------------------------------------------------------
     # PLOT 2: VaR & CAPITAL GAP (Fixed Overlaps)
     # ----------------------------------------------------------------------------------
-    # Calculate Metrics
-    alpha = 0.99
-    var_normal = norm.ppf(alpha, mu_norm, std_norm)
-    n_total = len(losses)
-    n_u = len(excesses)
-    var_evt = u + (sigma/xi) * ( ((n_total/n_u)*(1-alpha))**(-xi) - 1 )
-    es_evt = (var_evt + sigma - xi * u) / (1 - xi)
+    # Metrics (from the risk_metrics stage)
+    var_normal, var_evt, es_evt = risk_metrics['var_normal'], risk_metrics['var_evt'], risk_metrics['es_evt']
+    var_lo, var_hi = risk_metrics['var_ci']
+    es_lo, es_hi = risk_metrics['es_ci']
     
     fig, ax = plt.subplots(figsize=(13, 8))
     
@@ -100,8 +153,8 @@ def generate_clean_evt_plots():
     # Legend with VALUES (Cleaner than putting text on lines)
     legend_elements = [
         plt.Line2D([0], [0], color='#00ccff', lw=2.5, ls='--', label=f'Gaussian VaR (99%): {var_normal:.2f}%'),
-        plt.Line2D([0], [0], color='#ff9900', lw=3, label=f'EVT VaR (99%): {var_evt:.2f}%'),
-        plt.Line2D([0], [0], color='#ff3333', lw=3, ls=':', label=f'Expected Shortfall (ES): {es_evt:.2f}%'),
+        plt.Line2D([0], [0], color='#ff9900', lw=3, label=f'EVT VaR (99%): {var_evt:.2f}% [95% CI {var_lo:.2f}-{var_hi:.2f}]'),
+        plt.Line2D([0], [0], color='#ff3333', lw=3, ls=':', label=f'Expected Shortfall (ES): {es_evt:.2f}% [95% CI {es_lo:.2f}-{es_hi:.2f}]'),
         plt.Rectangle((0,0),1,1, fc='#ff9900', alpha=0.2, label='Capital Gap (Uncovered Risk)')
     ]
     ax.legend(handles=legend_elements, loc='upper right', frameon=True, fontsize=11, facecolor='#222222', edgecolor='#444444')
@@ -129,8 +182,64 @@ def generate_clean_evt_plots():
     plt.figtext(0.5, 0.02, note2, ha='center', fontsize=11, color='#aaaaaa', style='italic')
     
     plt.subplots_adjust(bottom=0.15)
-    plt.savefig('evt_capital_gap_clean.png')
-    plt.show()
+    with stage('savefig', file='evt_capital_gap_clean.png'):
+        plt.savefig('evt_capital_gap_clean.png')
+    with stage('show'):
+        plt.show()
+
+@EVT_STAGES.stage('stability_plot', cache=False)
+def _stability_plot_stage(losses, tail_fit, sweep):
+    u_paper = tail_fit['u']
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+    
+    # Mean Excess Function (linear above a valid GPD threshold)
+    band = 1.96 * sweep['mean_excess_se']
+    ax1.plot(sweep['threshold'], sweep['mean_excess'], color='#ff9900', linewidth=2.5)
+    ax1.fill_between(sweep['threshold'], sweep['mean_excess'] - band, sweep['mean_excess'] + band,
+                     color='#ff9900', alpha=0.2)
+    ax1.set_title('Mean Excess Function', fontsize=18, fontweight='bold', color='white', pad=20)
+    ax1.set_xlabel('Threshold u', fontsize=13, color='#cccccc')
+    ax1.set_ylabel('E[L - u | L > u]', fontsize=13, color='#cccccc')
+    
+    # Shape Parameter Stability (flat above a valid GPD threshold)
+    ax2.plot(sweep['threshold'], sweep['xi'], color='#ff3333', linewidth=2.5)
+    ax2.set_title('GPD Shape Stability (xi)', fontsize=18, fontweight='bold', color='white', pad=20)
+    ax2.set_xlabel('Threshold u', fontsize=13, color='#cccccc')
+    ax2.set_ylabel('xi', fontsize=13, color='#cccccc')
+    
+    for ax in (ax1, ax2):
+        ax.axvline(u_paper, color='#00ccff', linestyle='--', linewidth=2, label=f'Paper threshold (95%): {u_paper:.3f}')
+        ax.grid(color='gray', linestyle=':', linewidth=0.5, alpha=0.3)
+        ax.legend(loc='upper left', frameon=True, fontsize=11, facecolor='#222222', edgecolor='#444444')
+    
+    note = ("DIAGNOSTIC: A threshold is valid where the mean excess turns linear and xi stops drifting.\n"
+            "Below it the GPD approximation is biased; far above it the estimates become noisy.")
+    plt.figtext(0.5, 0.02, note, ha='center', fontsize=11, color='#aaaaaa', style='italic')
+    
+    plt.subplots_adjust(bottom=0.18, wspace=0.25)
+    with stage('savefig', file='evt_threshold_stability.png'):
+        plt.savefig('evt_threshold_stability.png')
+    with stage('show'):
+        plt.show()
+
+@traced
+@paper_style(PLOT_STYLE)
+def generate_clean_evt_plots(n=10000, seed=42, workers=None, block_size=1_000_000, cache=None, n_boot=1000,
+                             store=None):
+    EVT_STAGES.run('tail_plots', store=store, n=n, seed=seed, workers=workers, block_size=block_size, cache=cache,
+                   n_boot=n_boot)
+
+@traced
+@paper_style(PLOT_STYLE)
+def generate_threshold_stability_plots(n=10000, seed=42, workers=None, block_size=1_000_000, cache=None,
+                                       method='pwm', store=None):
+    outputs = EVT_STAGES.run('stability_plot', store=store, n=n, seed=seed, workers=workers, block_size=block_size,
+                             cache=cache, method=method)
+    return outputs['sweep']
 
 if __name__ == "__main__":
-    generate_clean_evt_plots()
+    cache = SimulationCache()
+    store = StageStore()
+    generate_clean_evt_plots(cache=cache, store=store)
+    generate_threshold_stability_plots(cache=cache, store=store)
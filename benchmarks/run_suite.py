@@ -0,0 +1,186 @@
+"""Run the benchmark suite and keep its history to catch regressions.
+
+    python benchmarks/run_suite.py [-k PATTERN] [--repeat N] [--quick] [--history FILE] [--threshold R]
+
+The suite modules (``benchmarks/suite_*.py``) follow asv's conventions:
+classes with ``params`` / ``param_names``, ``setup`` / ``teardown`` and
+``time_*`` methods, one benchmark per method and parameter combination, and
+``setup`` raising ``NotImplementedError`` to skip a combination. ``setup``
+runs once per class and combination, then every ``time_*`` method is called
+once to warm up and timed ``--repeat`` times; the median and minimum are kept.
+
+Every run is appended as one JSON line to the history file (default
+``.benchmarks/history.jsonl`` at the repository root) with the git commit,
+time, machine and library versions. It is then compared with the latest
+earlier run on the same machine: a benchmark whose median grew by more than
+``--threshold`` is reported as a regression and the exit status is 1.
+"""
+import argparse
+import datetime
+import glob
+import importlib
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SUITE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(SUITE_DIR)
+DEFAULT_HISTORY = os.path.join(ROOT, '.benchmarks', 'history.jsonl')
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import scipy
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+    }
+
+
+def _suites():
+    sys.path.insert(0, SUITE_DIR)
+    for path in sorted(glob.glob(os.path.join(SUITE_DIR, 'suite_*.py'))):
+        yield importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+
+
+def _cases(module):
+    """``(class name, class, {param: value}, methods)`` per class and parameter combination."""
+    for name, cls in inspect.getmembers(module, inspect.isclass):
+        if cls.__module__ != module.__name__:
+            continue
+        methods = sorted(m for m in vars(cls) if m.startswith('time_'))
+        params = getattr(cls, 'params', [])
+        if params and not isinstance(params[0], (list, tuple)):
+            params = [params]
+        names = getattr(cls, 'param_names', [f'param{i + 1}' for i in range(len(params))])
+        for combo in itertools.product(*params):
+            yield name, cls, dict(zip(names, combo)), methods
+
+
+def _key(record):
+    return record['name'], json.dumps(record['params'], sort_keys=True)
+
+
+def _timings(func, args, repeat, warmup):
+    if warmup:
+        func(*args)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(pattern=None, repeat=5, warmup=True):
+    """Run the matching benchmarks; returns one record per benchmark and parameter combination."""
+    select = re.compile(pattern) if pattern else None
+    records = []
+    for module in _suites():
+        for class_name, cls, params, methods in _cases(module):
+            names = [f'{module.__name__}.{class_name}.{method}' for method in methods]
+            chosen = [(n, m) for n, m in zip(names, methods) if select is None or select.search(n)]
+            if not chosen:
+                continue
+            args = tuple(params.values())
+            bench = cls()
+            try:
+                if hasattr(bench, 'setup'):
+                    bench.setup(*args)
+            except NotImplementedError:
+                for name, _ in chosen:
+                    records.append({'name': name, 'params': params, 'skipped': True})
+                continue
+            try:
+                for name, method in chosen:
+                    samples = _timings(getattr(bench, method), args, repeat, warmup)
+                    record = {'name': name, 'params': params, 'median': float(np.median(samples)),
+                              'min': min(samples), 'repeat': repeat}
+                    records.append(record)
+                    print(f"{name:<66} {json.dumps(params):<46} {1e3 * record['median']:>11.2f} ms", flush=True)
+            finally:
+                if hasattr(bench, 'teardown'):
+                    bench.teardown(*args)
+    return records
+
+
+def previous_run(history, machine):
+    """Latest run recorded in ``history`` for ``machine`` (None if there is none)."""
+    last = None
+    if os.path.exists(history):
+        with open(history) as fh:
+            for line in fh:
+                entry = json.loads(line)
+                if entry['environment']['machine'] == machine:
+                    last = entry
+    return last
+
+
+def compare(records, baseline, threshold):
+    """``(record, baseline median, ratio)`` for each benchmark slower than ``threshold`` x baseline."""
+    before = {_key(r): r['median'] for r in baseline['results'] if 'median' in r}
+    regressions = []
+    for record in records:
+        old = before.get(_key(record))
+        if old and 'median' in record and record['median'] > threshold * old:
+            regressions.append((record, old, record['median'] / old))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the zyllica benchmark suite and record its history.')
+    parser.add_argument('-k', dest='pattern', default=None, help='only benchmarks whose name matches this regex')
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls per benchmark (default: 5)')
+    parser.add_argument('--quick', action='store_true', help='one call per benchmark, no warm-up')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSON-lines history file')
+    parser.add_argument('--no-save', action='store_true', help='compare only, do not append to the history')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio reported as a regression (default: 1.25)')
+    args = parser.parse_args(argv)
+
+    environment = _environment()
+    records = run(args.pattern, 1 if args.quick else args.repeat, warmup=not args.quick)
+    baseline = previous_run(args.history, environment['machine'])
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a') as fh:
+            fh.write(json.dumps({'environment': environment, 'results': records}) + '\n')
+
+    if baseline is None:
+        print(f"no earlier run on {environment['machine']} to compare with")
+        return 0
+    regressions = compare(records, baseline, args.threshold)
+    reference = (baseline['environment']['commit'] or '?')[:10]
+    for record, old, ratio in regressions:
+        print(f"REGRESSION {record['name']} {json.dumps(record['params'])}: "
+              f"{1e3 * old:.2f} -> {1e3 * record['median']:.2f} ms ({ratio:.2f}x vs {reference})")
+    print(f"{len(regressions)} regression(s) over {args.threshold:.2f}x against {reference} "
+          f"({baseline['environment']['time']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
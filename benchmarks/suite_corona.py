@@ -0,0 +1,27 @@
+"""``sns.regplot`` with its 95% bootstrap band, as drawn three times in ``CoronaPaper/CoronaGraphs.py``."""
+import numpy as np
+
+
+class RegplotBootstrap:
+    """Regression line + 1000-resample confidence band (``n=10`` is the paper's country sample)."""
+
+    params = [[10, 1_000, 10_000]]
+    param_names = ['n']
+
+    def setup(self, n):
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        self.plt, self.sns = plt, sns
+        rng = np.random.default_rng(42)
+        self.x = rng.uniform(45, 110, n)
+        self.y = 300 - 2.5 * self.x + rng.normal(0, 40, n)
+        self.fig, self.ax = plt.subplots()
+
+    def teardown(self, n):
+        self.plt.close(self.fig)
+
+    def time_regplot(self, n):
+        self.ax.clear()
+        self.sns.regplot(x=self.x, y=self.y, ax=self.ax, ci=95, n_boot=1000, seed=42)
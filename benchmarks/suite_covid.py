@@ -0,0 +1,27 @@
+"""Population Monte Carlo of ``COVID19/COVID19_3_MonteCarloSimulation.py``."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.papers import load_paper
+from zyllica.parallel import run_blocks
+
+covid = load_paper('covid_monte_carlo')
+
+
+class PopulationSimulation:
+    """Dense population + lethal tail as in the paper, and the bounded-memory streaming pass."""
+
+    params = [[10_000, 1_000_000, 5_000_000]]
+    param_names = ['N']
+
+    def time_dense(self, N):
+        pdg, arf, isg = np.hstack(run_blocks(covid._population_block, N, 42, block_size=1_000_000, workers=1))
+        lethality_index = pdg * arf * isg
+        threshold = np.percentile(lethality_index, 95)
+        np.mean(pdg[lethality_index >= threshold])
+
+    def time_stream_population_statistics(self, N):
+        covid.stream_population_statistics(N, workers=1)
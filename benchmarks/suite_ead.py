@@ -0,0 +1,29 @@
+"""LGD fit of ``EAD /EAD Graphs.py``: the Beta mixture EM against scipy's single ``beta.fit``."""
+import os
+import sys
+
+import numpy as np
+from scipy.stats import beta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.beta_mixture import fit_beta_mixture
+
+
+class LGDFit:
+    """Bimodal LGDs as in the paper (4/7 cures ~ Beta(0.5, 5), write-offs ~ Beta(5, 0.5))."""
+
+    params = [[7_000, 100_000, 1_000_000], ['newton', 'moments', 'scipy']]
+    param_names = ['n', 'method']
+
+    def setup(self, n, method):
+        if method == 'scipy' and n > 100_000:
+            raise NotImplementedError  # minutes per fit, not worth waiting for
+        rng = np.random.default_rng(42)
+        n_cure = n * 4 // 7
+        self.x = np.concatenate([rng.beta(0.5, 5, n_cure), rng.beta(5, 0.5, n - n_cure)])
+
+    def time_fit(self, n, method):
+        if method == 'scipy':
+            beta.fit(self.x)
+        else:
+            fit_beta_mixture(self.x, m_step=method)
@@ -0,0 +1,65 @@
+"""GPD tail fit, VaR/ES and their bootstrap in ``Ruin Model EVT/EVT.py``."""
+import os
+import sys
+
+import numpy as np
+from scipy.stats import genpareto
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.evt import bootstrap_pot, pot_estimate
+from zyllica.gpd import fit_mle, pot_es, pot_var
+from zyllica.papers import load_paper
+
+evt = load_paper('evt')
+
+
+class GPDFit:
+    """Newton MLE of ``zyllica.gpd`` against scipy's ``genpareto.fit(excesses, floc=0)``."""
+
+    params = [[100, 1_000, 10_000, 100_000], [-0.2, 0.0, 0.3], ['newton', 'scipy']]
+    param_names = ['n', 'xi', 'method']
+
+    def setup(self, n, xi, method):
+        self.excesses = genpareto.rvs(xi, scale=0.02, size=n, random_state=np.random.default_rng(42))
+
+    def time_fit(self, n, xi, method):
+        if method == 'scipy':
+            genpareto.fit(self.excesses, floc=0)
+        else:
+            fit_mle(self.excesses)
+
+
+class TailFit:
+    """Peaks-over-threshold calibration of the paper's Student-t losses."""
+
+    params = [[10_000, 100_000, 1_000_000]]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.losses = evt.simulate_losses(n, seed=42, workers=1)
+        self.u = np.percentile(self.losses, 95)
+        self.excesses = self.losses[self.losses > self.u] - self.u
+
+    def time_fit_mle(self, n):
+        fit_mle(self.excesses)
+
+    def time_var_es(self, n):
+        fit = fit_mle(self.excesses)
+        var = pot_var(self.u, fit['xi'], fit['sigma'], len(self.losses), len(self.excesses), 0.99)
+        pot_es(var, self.u, fit['xi'], fit['sigma'])
+
+    def time_pot_estimate(self, n):
+        pot_estimate(self.losses)
+
+
+class Bootstrap:
+    """Bootstrap intervals of VaR/ES (threshold re-selected per resample)."""
+
+    params = [[1_000, 10_000], [200, 1_000]]
+    param_names = ['n', 'n_boot']
+
+    def setup(self, n, n_boot):
+        self.losses = evt.simulate_losses(n, seed=42, workers=1)
+
+    def time_bootstrap_pot(self, n, n_boot):
+        bootstrap_pot(self.losses, n_boot=n_boot, workers=1)
@@ -0,0 +1,58 @@
+"""Random-portfolio cloud and frontier optimizers of ``Capital Allocation/Frontier.py``."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.frontier import efficient_frontier, max_sharpe_portfolio
+from zyllica.papers import load_paper
+from zyllica.parallel import run_blocks
+
+frontier = load_paper('frontier')
+
+RF = 0.03
+
+
+def _market(n_assets, seed=42):
+    """Expected returns and a full-rank covariance with the paper's ranges of return and volatility."""
+    rng = np.random.default_rng(seed)
+    mean_returns = rng.uniform(0.0, 0.25, n_assets)
+    vols = rng.uniform(0.05, 0.35, n_assets)
+    loadings = rng.standard_normal((n_assets, 2 * n_assets))
+    cov = loadings @ loadings.T
+    d = np.sqrt(np.diag(cov))
+    return mean_returns, np.outer(vols, vols) * cov / np.outer(d, d)
+
+
+class PortfolioCloud:
+    """Dirichlet portfolios as scattered by the paper, and the binned raster for large clouds."""
+
+    params = [[10_000, 100_000, 1_000_000], [5, 50]]
+    param_names = ['num_ports', 'n_assets']
+
+    def setup(self, num_ports, n_assets):
+        self.mean_returns, self.cov = _market(n_assets)
+
+    def time_random_portfolios(self, num_ports, n_assets):
+        run_blocks(frontier._random_portfolios_block, num_ports, 42, block_size=1_000_000, workers=1,
+                   args=(self.mean_returns, self.cov, RF))
+
+    def time_random_portfolio_density(self, num_ports, n_assets):
+        frontier.random_portfolio_density(self.mean_returns, self.cov, RF, num_ports, workers=1)
+
+
+class Optimizers:
+    """Whole frontier (active set, SLSQP fallback) and the SLSQP tangency portfolio."""
+
+    params = [[5, 50, 200]]
+    param_names = ['n_assets']
+
+    def setup(self, n_assets):
+        self.mean_returns, self.cov = _market(n_assets)
+
+    def time_efficient_frontier(self, n_assets):
+        efficient_frontier(self.mean_returns, self.cov, RF, n_points=200)
+
+    def time_max_sharpe_slsqp(self, n_assets):
+        max_sharpe_portfolio(self.mean_returns, self.cov, RF)
@@ -0,0 +1,49 @@
+"""GBM path generation: ``risk_simulation`` and ``Beyond the Average/ConeOfUncertainty.py``."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import risk_simulation
+from zyllica.papers import load_paper
+
+cone = load_paper('cone_of_uncertainty')
+
+S0, MU, SIGMA, T, DT = 100, 0.08, 0.20, 1.0, 1 / 252
+
+
+class RiskSimulationPaths:
+    """Dense [days x paths] matrices of ``simulate_gbm_paths``: the Euler scheme as prices and as log prices."""
+
+    params = [[1_000, 10_000, 100_000], ['plain', 'antithetic', 'sobol']]
+    param_names = ['n_paths', 'sampling']
+
+    def setup(self, n_paths, sampling):
+        self.rng = np.random.default_rng(42)
+
+    def time_euler(self, n_paths, sampling):
+        risk_simulation.simulate_gbm_paths(100, 252, 0.0005, 0.02, n_paths, rng=self.rng, sampling=sampling)
+
+    def time_euler_log_prices(self, n_paths, sampling):
+        risk_simulation.simulate_gbm_paths(100, 252, 0.0005, 0.02, n_paths, log_prices=True, rng=self.rng,
+                                           sampling=sampling)
+
+
+class ConeOfUncertainty:
+    """Exact (log-space) GBM: the paper's dense block, streaming fan-chart statistics and terminal sampler."""
+
+    params = [[1_000, 10_000, 100_000]]
+    param_names = ['sims']
+
+    def setup(self, sims):
+        self.rng = np.random.default_rng(42)
+
+    def time_dense_paths(self, sims):
+        cone._gbm_block(self.rng, sims, S0, MU, SIGMA, DT, int(T / DT))
+
+    def time_stream_cone_statistics(self, sims):
+        cone.stream_cone_statistics(S0, MU, SIGMA, T, DT, sims, workers=1)
+
+    def time_terminal_tail_risk(self, sims):
+        cone.terminal_tail_risk(sims, S0, MU, SIGMA, T, DT, workers=1)
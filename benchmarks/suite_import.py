@@ -0,0 +1,32 @@
+"""Cold import time of the zyllica modules and the paper scripts.
+
+Every call starts a fresh interpreter, so the times include the process
+start-up; the ``python`` target is the bare interpreter to compare against.
+``python -m zyllica run`` reports the import and start-up split for a full
+paper run.
+"""
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from zyllica.papers import PAPERS, ROOT
+
+TARGETS = {'python': 'pass'}
+TARGETS.update({name: f'import {name}' for name in
+                ('numpy', 'zyllica.credit', 'zyllica.frontier', 'zyllica.sampling', 'risk_simulation')})
+TARGETS.update({f'load_paper({paper!r})': f'from zyllica.papers import load_paper; load_paper({paper!r})'
+                for paper in PAPERS})
+
+
+class ColdImport:
+    """One ``python -c '<import>'`` per call."""
+
+    params = [list(TARGETS)]
+    param_names = ['target']
+
+    def setup(self, target):
+        self.command = [sys.executable, '-c', TARGETS[target]]
+
+    def time_import(self, target):
+        subprocess.run(self.command, cwd=ROOT, check=True)
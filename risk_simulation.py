@@ -1,38 +1,117 @@
+import os
+import sys
+
 import numpy as np
-import pandas as pd
 
-def monte_carlo_simulation(start_price, days, mu, sigma):
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from zyllica.lazy import lazy_import
+from zyllica.sampling import SAMPLING_MODES, check_path_sampling, compare_sampling_modes, standard_normals
+
+pd = lazy_import('pandas')  # only the report table needs it
+
+def monte_carlo_simulation(start_price, days, mu, sigma, dt=1):
     """
-    Simula la trayectoria de precios de un activo usando 
+    Simula la trayectoria de precios de un activo usando
     Movimiento Browniano Geométrico.
-    
+
     Parámetros:
     - start_price: Precio inicial
     - days: Días a proyectar
     - mu: Retorno esperado
     - sigma: Volatilidad diaria
+    - dt: Tamaño del paso temporal
+    """
+    return simulate_gbm_paths(start_price, days, mu, sigma, n_paths=1, dt=dt)[:, 0]
+
+def simulate_gbm_paths(start_price, days, mu, sigma, n_paths, dt=1,
+                       log_prices=False, rng=None, dtype=np.float64, sampling='plain'):
+    """
+    Motor vectorizado: simula `n_paths` trayectorias de una sola pasada.
+
+    Reproduce el esquema discreto de `monte_carlo_simulation`
+    (price[x] = price[x-1] * (1 + drift + shock)) pero sin el bucle por día:
+    los choques se generan como una matriz y se acumulan con `cumprod`.
+
+    Parámetros:
+    - start_price: Precio inicial
+    - days: Días a proyectar (incluye el día 0)
+    - mu: Retorno esperado
+    - sigma: Volatilidad diaria
+    - n_paths: Número de trayectorias
+    - dt: Tamaño del paso temporal
+    - log_prices: Si es True devuelve los log-precios del mismo esquema de Euler
+      (log S0 + cumsum(log(1 + 2 mu dt + sigma sqrt(dt) Z))), de modo que
+      exp(salida) coincide con el modo de precios; mismo modelo, otra escala
+    - rng: Generador de números aleatorios (np.random.Generator);
+      por defecto usa el estado global de np.random
+    - dtype: Tipo de dato de la matriz (float32 reduce memoria a la mitad)
+    - sampling: Modo de muestreo ('plain', 'antithetic', 'sobol'); la variable
+      de control solo existe en `terminal_risk_report` (ValueError aquí)
+
+    Retorna una matriz (days x n_paths).
     """
-    price = np.zeros(days)
-    price[0] = start_price
-    
-    shock = np.zeros(days)
-    drift = np.zeros(days)
-    
-    for x in range(1, days):
-        shock[x] = np.random.normal(loc=mu * dt, scale=sigma * np.sqrt(dt))
-        drift[x] = mu * dt
-        price[x] = price[x-1] + (price[x-1] * (drift[x] + shock[x]))
-        
-    return price
-
-# Configuración Inicial para Zyllica Risk Model
-start_price = 100
-days = 365
-mu = 0.0002
-sigma = 0.01
-dt = 1
-
-# Ejecutar Simulación
-simulated_path = monte_carlo_simulation(start_price, days, mu, sigma)
-
-print(f"Precio proyectado al día {days}: {simulated_path[days-1]:.2f}")
+    check_path_sampling(sampling, 'terminal_risk_report')
+    if rng is None:
+        rng = np.random
+
+    steps = standard_normals(rng, (days - 1, n_paths), sampling).astype(dtype, copy=False)
+    out = np.empty((days, n_paths), dtype=dtype)
+
+    if log_prices:
+        # Log del factor diario de Euler: la suma acumulada reemplaza al producto
+        steps *= sigma * np.sqrt(dt)
+        steps += 2 * mu * dt
+        np.log1p(steps, out=steps)
+        out[0] = np.log(start_price)
+        np.cumsum(steps, axis=0, out=out[1:])
+        out[1:] += out[0]
+        return out
+
+    # Esquema de Euler original: drift + shock con shock ~ N(mu*dt, sigma*sqrt(dt))
+    steps *= sigma * np.sqrt(dt)
+    steps += 1 + 2 * mu * dt
+    out[0] = start_price
+    np.cumprod(steps, axis=0, out=out[1:])
+    out[1:] *= start_price
+    return out
+
+def _terminal_prices(rng, n, start_price, days, mu, sigma, dt, sampling):
+    # Solo el precio final del esquema de Euler: producto de los factores diarios
+    steps = standard_normals(rng, (days - 1, n), sampling)
+    steps *= sigma * np.sqrt(dt)
+    steps += 1 + 2 * mu * dt
+    return start_price * np.prod(steps, axis=0)
+
+def terminal_risk_report(start_price, days, mu, sigma, n_paths, dt=1, alpha=0.05,
+                         modes=SAMPLING_MODES, replicates=16, seed=42, workers=None):
+    """
+    Compara los modos de muestreo con el mismo presupuesto de trayectorias.
+
+    Cada modo reporta media, VaR y CVaR del precio final con su error estándar
+    (a partir de `replicates` réplicas independientes) y su eficiencia frente a
+    Monte Carlo simple: cuántas veces más trayectorias necesitaría 'plain' para
+    alcanzar la misma precisión en el VaR.
+
+    La variable de control es el precio final, con E[S_T] analítico del esquema
+    de Euler: start_price * (1 + 2 mu dt)^(days - 1).
+    """
+    expected = start_price * (1 + 2 * mu * dt)**(days - 1)
+    reports = compare_sampling_modes(_terminal_prices, (start_price, days, mu, sigma, dt), n_paths,
+                                     expected, modes, alpha, replicates, seed, workers)
+    return pd.DataFrame(reports).set_index('sampling')
+
+if __name__ == "__main__":
+    # Configuración Inicial para Zyllica Risk Model
+    start_price = 100
+    days = 365
+    mu = 0.0002
+    sigma = 0.01
+    dt = 1
+
+    # Ejecutar Simulación
+    simulated_path = monte_carlo_simulation(start_price, days, mu, sigma, dt)
+
+    print(f"Precio proyectado al día {days}: {simulated_path[days-1]:.2f}")
+
+    # Error estándar alcanzado por cada modo de reducción de varianza
+    print(terminal_risk_report(start_price, days, mu, sigma, n_paths=64_000, dt=dt).round(4).to_string())
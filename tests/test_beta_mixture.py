@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from scipy.stats import beta
+
+from zyllica.beta_mixture import beta_mixture_pdf, fit_beta_mixture, sample_beta_mixture
+
+TRUTH = {'weights': np.array([0.6, 0.4]), 'alpha': np.array([0.8, 5.0]), 'beta': np.array([6.0, 1.2])}
+
+
+def _lgds(n=20_000, seed=0):
+    return sample_beta_mixture(np.random.default_rng(seed), n, TRUTH)
+
+
+def test_em_recovers_the_mixture():
+    fit = fit_beta_mixture(_lgds())
+    assert fit['converged']
+    np.testing.assert_allclose(fit['weights'], TRUTH['weights'], atol=0.02)
+    np.testing.assert_allclose(fit['alpha'], TRUTH['alpha'], rtol=0.08)
+    np.testing.assert_allclose(fit['beta'], TRUTH['beta'], rtol=0.08)
+    np.testing.assert_allclose(fit['means'], fit['alpha'] / (fit['alpha'] + fit['beta']))
+
+
+def test_single_component_newton_step_is_the_beta_mle():
+    x = np.random.default_rng(1).beta(2.0, 5.0, 5_000)
+    fit = fit_beta_mixture(x, n_components=1)
+    a, b, _, _ = beta.fit(x, floc=0, fscale=1)
+    assert fit['alpha'][0] == pytest.approx(a, rel=1e-4)
+    assert fit['beta'][0] == pytest.approx(b, rel=1e-4)
+
+
+def test_newton_m_step_beats_moments_in_likelihood():
+    x = _lgds(5_000)
+    newton, moments = fit_beta_mixture(x), fit_beta_mixture(x, m_step='moments')
+    assert newton['loglik'] >= moments['loglik']
+    with pytest.raises(ValueError, match='m_step'):
+        fit_beta_mixture(x, m_step='gradient')
+
+
+def test_mixture_density_integrates_to_one():
+    # Midpoint rule on (0, 1)
+    grid = (np.arange(200_000) + 0.5) / 200_000
+    density = beta_mixture_pdf(grid, fit_beta_mixture(_lgds(5_000)))
+    assert density.mean() == pytest.approx(1.0, abs=5e-3)
@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+
+from zyllica.cache import SimulationCache, cached
+
+
+def test_hit_returns_a_read_only_memmap_without_simulating(tmp_path):
+    cache = SimulationCache(str(tmp_path))
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return np.arange(10.0)
+
+    first = cache.get_or_create('gbm', {'mu': 0.08, 'sigma': 0.2}, 42, 10, factory)
+    second = cache.get_or_create('gbm', {'sigma': 0.2, 'mu': 0.08}, 42, 10, factory)
+    assert len(calls) == 1
+    assert isinstance(second, np.memmap) and not second.flags.writeable
+    np.testing.assert_array_equal(first, second)
+
+
+def test_key_covers_every_part_of_the_simulation():
+    base = ('gbm', {'mu': 0.08}, 42, 10, np.float64)
+    key = SimulationCache.key(*base)
+    assert key == SimulationCache.key('gbm', {'mu': np.float64(0.08)}, 42, 10, 'f8')
+    assert key != SimulationCache.key('gbm', {'mu': 0.081}, 42, 10, np.float64)
+    assert key != SimulationCache.key('gbm', {'mu': 0.08}, 43, 10, np.float64)
+    assert key != SimulationCache.key('gbm', {'mu': 0.08}, 42, 11, np.float64)
+    assert key != SimulationCache.key('gbm', {'mu': 0.08}, 42, 10, np.float32)
+
+
+def test_put_evicts_the_least_recently_used(tmp_path):
+    array = np.zeros(1_000)
+    cache = SimulationCache(str(tmp_path), max_bytes=3.5 * array.nbytes)
+    for seed in range(3):
+        cache.put('gbm', {}, seed, 1_000, array)
+        os.utime(cache._path(cache.key('gbm', {}, seed, 1_000, np.float64)), (seed, seed))
+    # Reading seed 0 makes seed 1 the oldest entry
+    cache.get('gbm', {}, 0, 1_000)
+    cache.put('gbm', {}, 3, 1_000, array)
+    assert cache.get('gbm', {}, 1, 1_000) is None
+    assert cache.get('gbm', {}, 0, 1_000) is not None
+    assert cache.size() <= cache.max_bytes
+
+
+def test_cached_without_a_cache_just_simulates():
+    np.testing.assert_array_equal(cached(None, 'gbm', {}, 0, 3, lambda: np.ones(3)), np.ones(3))
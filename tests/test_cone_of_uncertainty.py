@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from scipy.stats import norm
+
+from zyllica.papers import load_paper
+from zyllica.parallel import run_blocks
+
+cone = load_paper('cone_of_uncertainty')
+
+S0, MU, SIGMA, T, DT = 100, 0.08, 0.20, 0.1, 1 / 252
+
+
+def test_streamed_bands_match_dense_percentiles():
+    # Same seed and chunk layout as the dense blocks, so both see exactly the same paths
+    sims, chunk = 20_000, 5_000
+    stats = cone.stream_cone_statistics(S0, MU, SIGMA, T, DT, sims, chunk_size=chunk, sketch_size=512, workers=1)
+    N = int(T / DT)
+    paths = np.hstack(run_blocks(cone._gbm_block, sims, 42, block_size=chunk, workers=1,
+                                 args=(S0, MU, SIGMA, DT, N)))
+    for level, band in stats['bands'].items():
+        np.testing.assert_allclose(band, np.percentile(paths, level, axis=1), rtol=2e-3)
+    final = np.sort(paths[-1])
+    assert stats['var'] == pytest.approx(np.percentile(final, 5), rel=2e-3)
+    assert stats['cvar'] == pytest.approx(final[:sims // 20].mean(), rel=2e-3)
+    assert stats['mean'] == pytest.approx(final.mean(), rel=1e-12)
+    assert stats['hist_counts'].sum() == sims
+
+
+def test_terminal_sampler_matches_the_path_endpoint_law():
+    # S_T over the plotted horizon is log-normal; both samplers must reproduce its mean and 5% quantile
+    N = int(T / DT)
+    horizon = (N - 1) * DT
+    mean = S0 * np.exp(MU * horizon)
+    var = S0 * np.exp((MU - 0.5 * SIGMA**2) * horizon + SIGMA * np.sqrt(horizon) * norm.ppf(0.05))
+    exact = cone.terminal_tail_risk(200_000, S0, MU, SIGMA, T, DT, workers=1)
+    final = np.hstack(run_blocks(cone._gbm_block, 200_000, 1, block_size=50_000, workers=1,
+                                 args=(S0, MU, SIGMA, DT, N)))[-1]
+    for estimate in (exact['mean'], final.mean()):
+        assert estimate == pytest.approx(mean, rel=1e-3)
+    for estimate in (exact['var_95'], np.percentile(final, 5)):
+        assert estimate == pytest.approx(var, rel=2e-3)
+    assert exact['cvar_95'] == pytest.approx(final[final <= np.percentile(final, 5)].mean(), rel=2e-3)
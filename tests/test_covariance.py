@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from zyllica.covariance import DenseCovariance, FactorCovariance, factor_model, ledoit_wolf
+from zyllica.frontier import efficient_frontier, resampled_frontier
+
+N_ASSETS, N_OBS = 20, 12
+
+
+def _returns(n_obs=240, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.standard_normal((n_obs, 1)) * 0.04
+    return 0.01 + market * rng.uniform(0.5, 1.5, N_ASSETS) + rng.standard_normal((n_obs, N_ASSETS)) * 0.02
+
+
+def _mean_returns():
+    return np.linspace(0.02, 0.12, N_ASSETS)
+
+
+def test_ledoit_wolf_refit_keeps_shrinkage():
+    cov, _ = ledoit_wolf(_returns())
+    refitted = cov.refit(_returns(N_OBS, seed=1))
+    assert refitted.estimator == 'ledoit_wolf'
+    assert np.all(np.linalg.eigvalsh(refitted.dense()) > 0)
+
+
+def test_sample_refit_rejects_too_few_observations():
+    cov = DenseCovariance(np.cov(_returns(), rowvar=False))
+    with pytest.raises(ValueError, match='singular'):
+        cov.refit(_returns(N_OBS, seed=1))
+
+
+@pytest.mark.parametrize('make', [lambda r: ledoit_wolf(r)[0], lambda r: factor_model(r, 2)])
+def test_resampled_frontier_with_fewer_observations_than_assets(make):
+    cov = make(_returns())
+    result = resampled_frontier(_mean_returns(), cov, n_obs=N_OBS, n_resamples=8, n_points=10, workers=1)
+    assert np.all(np.isfinite(result['volatilities']))
+    assert np.all(np.isfinite(result['tangency']['weights']))
+    assert result['tangency']['weights'].sum() == pytest.approx(1.0)
+    if isinstance(cov, FactorCovariance):
+        assert cov.refit(_returns(N_OBS, seed=1)).n_factors == 2
+
+
+def test_resampled_frontier_sample_covariance_needs_more_observations():
+    cov = DenseCovariance(np.cov(_returns(), rowvar=False))
+    with pytest.raises(ValueError, match='n_obs <= n_assets'):
+        resampled_frontier(_mean_returns(), cov, n_obs=N_OBS, n_resamples=4, n_points=10, workers=1)
+
+
+def test_factor_operations_match_the_dense_matrix():
+    factor = factor_model(_returns(), 3)
+    dense = DenseCovariance(factor.dense())
+    rng = np.random.default_rng(2)
+    weights = rng.dirichlet(np.ones(N_ASSETS), 5)
+    np.testing.assert_allclose(factor.matvec(weights), dense.matvec(weights), rtol=1e-12)
+    np.testing.assert_allclose(factor.batch_variance(weights), dense.batch_variance(weights), rtol=1e-12)
+    np.testing.assert_allclose(factor.diagonal(), dense.diagonal(), rtol=1e-12)
+    # Woodbury subset solve against a dense solve on the principal submatrix
+    idx = np.array([0, 3, 4, 9, 15])
+    rhs = rng.standard_normal((len(idx), 2))
+    np.testing.assert_allclose(factor.solve(idx, rhs), np.linalg.solve(factor.dense()[np.ix_(idx, idx)], rhs),
+                               rtol=1e-10)
+
+
+def test_ledoit_wolf_is_a_convex_combination_with_the_scaled_identity():
+    returns = _returns(N_OBS)
+    cov, shrinkage = ledoit_wolf(returns)
+    sample = np.cov(returns, rowvar=False, bias=True)
+    assert 0 < shrinkage <= 1
+    target = np.trace(sample) / N_ASSETS * np.eye(N_ASSETS)
+    np.testing.assert_allclose(cov.dense(), (1 - shrinkage) * sample + shrinkage * target, rtol=1e-12)
+
+
+def test_factor_frontier_matches_the_dense_frontier():
+    factor = factor_model(_returns(), 3)
+    from_factor = efficient_frontier(_mean_returns(), factor, 0.01, n_points=30)
+    from_dense = efficient_frontier(_mean_returns(), factor.dense(), 0.01, n_points=30)
+    np.testing.assert_allclose(from_factor['weights'], from_dense['weights'], atol=1e-10)
+    np.testing.assert_allclose(from_factor['volatilities'], from_dense['volatilities'], rtol=1e-10)
+    np.testing.assert_allclose(from_factor['tangency']['weights'], from_dense['tangency']['weights'], atol=1e-10)
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_resampled_frontier_does_not_depend_on_the_worker_count(workers):
+    cov, _ = ledoit_wolf(_returns())
+    kwargs = dict(n_obs=N_OBS, n_resamples=12, n_points=10, block_size=4)
+    serial = resampled_frontier(_mean_returns(), cov, workers=1, **kwargs)
+    pooled = resampled_frontier(_mean_returns(), cov, workers=workers, **kwargs)
+    np.testing.assert_array_equal(serial['weights'], pooled['weights'])
+    np.testing.assert_array_equal(serial['tangency']['samples'], pooled['tangency']['samples'])
+    np.testing.assert_allclose(serial['weights'].sum(axis=1), 1.0, rtol=1e-12)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from zyllica.papers import load_paper
+from zyllica.parallel import run_blocks
+
+covid = load_paper('covid_monte_carlo')
+
+
+def test_streamed_population_statistics_match_the_dense_computation():
+    # Same seed and block layout, so the streamed cohorts are exactly the dense population
+    N, block_size = 400_000, 100_000
+    stats = covid.stream_population_statistics(N, seed=7, workers=1, block_size=block_size, sketch_size=2048)
+    pdg, arf, isg = np.hstack(run_blocks(covid._population_block, N, 7, block_size=block_size, workers=1))
+    lethality = pdg * arf * isg
+    threshold = np.percentile(lethality, 95)
+    victims = lethality >= threshold
+
+    assert stats['threshold'] == pytest.approx(threshold, rel=2e-3)
+    assert stats['hist_counts'].sum() == N
+    assert stats['n_victims'] + stats['n_survivors'] == pytest.approx(N)
+    assert stats['n_victims'] == pytest.approx(victims.sum(), rel=5e-3)
+    assert stats['avg_pdg_victims'] == pytest.approx(pdg[victims].mean(), rel=1e-3)
+    assert stats['avg_pdg_survivors'] == pytest.approx(pdg[~victims].mean(), rel=1e-3)
+    assert stats['avg_lgi_victims'] == pytest.approx(lethality[victims].mean(), rel=1e-3)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from scipy.stats import norm
+
+from zyllica.beta_mixture import fit_beta_mixture
+from zyllica.credit import simulate_credit_losses
+
+
+def _book(n_loans=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.01, 0.2, n_loans), rng.lognormal(0, 0.5, n_loans)
+
+
+def _defaults(pd, ead, lgd, **kwargs):
+    # One segment per loan, so every [scenario x loan] loss > 0 marks a default
+    result = simulate_credit_losses(pd, ead, lgd, segments=np.arange(len(pd)), n_scenarios=200, seed=3,
+                                    workers=1, block_size=50, loan_chunk=64, **kwargs)
+    return result['segment_losses'] > 0
+
+
+def test_lgd_model_does_not_change_the_defaults():
+    pd, ead = _book()
+    rng = np.random.default_rng(1)
+    mixture = fit_beta_mixture(np.concatenate([rng.beta(0.5, 5, 2000), rng.beta(5, 0.5, 1500)]), n_components=2)
+    flat = _defaults(pd, ead, 0.45)
+    assert flat.any()
+    np.testing.assert_array_equal(flat, _defaults(pd, ead, mixture))
+
+
+def test_pd_cut_only_removes_defaults():
+    # Common random numbers: lowering some PDs can only switch defaults off, never move the others
+    pd, ead = _book()
+    cut = pd.copy()
+    cut[:50] *= 0.5
+    before, after = _defaults(pd, ead, 0.45), _defaults(cut, ead, 0.45)
+    np.testing.assert_array_equal(before[:, 50:], after[:, 50:])
+    assert np.all(after[:, :50] <= before[:, :50])
+
+
+def test_homogeneous_book_matches_the_vasicek_large_portfolio_law():
+    # Fine-grained book: the loss fraction x has P(L <= x) = Phi((sqrt(1 - rho) Phi^-1(x / LGD) - Phi^-1(PD)) / sqrt(rho)),
+    # so each simulated q-quantile should sit at probability ~q under that law
+    n_loans, pd, rho, lgd = 5_000, 0.02, 0.15, 0.45
+    result = simulate_credit_losses(np.full(n_loans, pd), np.ones(n_loans), lgd, rho=rho, n_scenarios=4_000,
+                                    alpha=0.99, seed=0, workers=1, block_size=500, loan_chunk=2_500)
+    assert result['expected_loss'] == pytest.approx(n_loans * pd * lgd, rel=0.02)
+    for q, loss in result['quantiles'].items():
+        x = loss / n_loans / lgd
+        vasicek = norm.cdf((np.sqrt(1 - rho) * norm.ppf(x) - norm.ppf(pd)) / np.sqrt(rho))
+        assert vasicek == pytest.approx(q, abs=0.025)
+
+
+def test_shared_book_gives_the_same_losses_on_any_worker_count():
+    pd, ead = _book()
+    kwargs = dict(segments=np.arange(len(pd)) % 4, n_scenarios=300, seed=5, block_size=50, loan_chunk=64)
+    serial = simulate_credit_losses(pd, ead, 0.45, workers=1, **kwargs)
+    pooled = simulate_credit_losses(pd, ead, 0.45, workers=2, **kwargs)
+    np.testing.assert_array_equal(serial['segment_losses'], pooled['segment_losses'])
+    assert sum(serial['segment_es_contribution']) == pytest.approx(serial['es'])
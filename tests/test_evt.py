@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from zyllica.evt import RollingPOT, bootstrap_pot, pot_estimate, threshold_sweep
+from zyllica.gpd import fit_mle, fit_pwm, pot_es, pot_var
+
+
+def _losses(n=3_000, seed=0):
+    # Student-t losses: a heavy right tail with xi = 1/4
+    return np.abs(np.random.default_rng(seed).standard_t(4, n))
+
+
+@pytest.mark.parametrize('method', ['pwm', 'mle'])
+def test_sweep_matches_a_fit_at_every_threshold(method):
+    losses = _losses()
+    sweep = threshold_sweep(losses, n_thresholds=25, method=method, workers=1)
+    for u, k, mean_excess, xi, sigma in zip(sweep['threshold'], sweep['n_exceed'], sweep['mean_excess'],
+                                            sweep['xi'], sweep['sigma']):
+        excesses = losses[losses > u] - u
+        assert k == len(excesses)
+        assert mean_excess == pytest.approx(excesses.mean(), rel=1e-10)
+        if method == 'pwm':
+            expected = fit_pwm(excesses)
+        else:
+            fit = fit_mle(excesses)
+            expected = fit['xi'], fit['sigma']
+        assert xi == pytest.approx(expected[0], rel=1e-6, abs=1e-9)
+        assert sigma == pytest.approx(expected[1], rel=1e-6)
+
+
+@pytest.mark.parametrize('threshold', [None, 2.0])
+def test_rolling_pot_matches_a_refit_of_the_last_window(threshold):
+    losses = _losses()
+    rolling = RollingPOT(window=1_000, tail_fraction=0.05, alpha=0.99, threshold=threshold)
+    result = rolling.update_many(losses)
+    assert rolling.n_refits < len(losses)
+
+    window = np.sort(losses[-1_000:])
+    u = window[-51] if threshold is None else threshold
+    excesses = window[window > u] - u
+    fit = fit_mle(excesses)
+    var = pot_var(u, fit['xi'], fit['sigma'], len(window), len(excesses), 0.99)
+    assert result['u'][-1] == u
+    assert result['var'][-1] == pytest.approx(var, rel=1e-8)
+    assert result['es'][-1] == pytest.approx(pot_es(var, u, fit['xi'], fit['sigma']), rel=1e-8)
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_bootstrap_does_not_depend_on_the_worker_count(workers):
+    losses = _losses(1_000)
+    serial = bootstrap_pot(losses, n_boot=60, block_size=16, workers=1)
+    pooled = bootstrap_pot(losses, n_boot=60, block_size=16, workers=workers)
+    assert serial['estimate'] == pot_estimate(losses)
+    for name, values in serial['samples'].items():
+        assert len(values) == 60
+        np.testing.assert_array_equal(values, pooled['samples'][name])
+        assert serial['ci'][name] == pooled['ci'][name]
+    low, high = serial['ci']['var']
+    assert low < serial['estimate']['var'] < high
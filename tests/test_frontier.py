@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from scipy.optimize import minimize
+
+from zyllica.covariance import factor_model
+
+from zyllica.frontier import efficient_frontier, max_sharpe_portfolio, portfolio_return, portfolio_volatility
+from zyllica.papers import load_paper
+from zyllica.parallel import run_blocks
+
+frontier_paper = load_paper('frontier')
+
+INPUTS = frontier_paper._inputs_stage()
+MEAN, COV, RF = INPUTS['mean_returns'], INPUTS['cov_matrix'], INPUTS['rf']
+
+
+def test_batched_cloud_matches_the_per_portfolio_formulas():
+    rng = np.random.default_rng(0)
+    vol, ret, sharpe = frontier_paper._random_portfolios_block(rng, 50, MEAN, COV, RF)
+    weights = np.random.default_rng(0).dirichlet(np.ones(len(MEAN)), 50)
+    for w, v, r, s in zip(weights, vol, ret, sharpe, strict=True):
+        assert np.isclose(v, portfolio_volatility(w, COV), rtol=1e-12)
+        assert np.isclose(r, portfolio_return(w, MEAN), rtol=1e-12)
+        assert np.isclose(s, (r - RF) / v, rtol=1e-12)
+
+
+def test_density_raster_bins_every_scatter_portfolio():
+    density = frontier_paper.random_portfolio_density(MEAN, COV, RF, 25_000, bins=(40, 30), block_size=4_000,
+                                                      workers=1)
+    vol, ret, sharpe = np.hstack(run_blocks(frontier_paper._random_portfolios_block, 25_000, 42, block_size=4_000,
+                                            workers=1, args=(MEAN, COV, RF)))
+    bins = (density['vol_edges'], density['ret_edges'])
+    counts = np.histogram2d(vol, ret, bins=bins)[0]
+    assert density['counts'].sum() == 25_000
+    np.testing.assert_array_equal(density['counts'], counts)
+    mean_sharpe = np.histogram2d(vol, ret, bins=bins, weights=sharpe)[0] / np.maximum(counts, 1)
+    np.testing.assert_allclose(density['mean_sharpe'].filled(0), mean_sharpe, rtol=1e-10)
+
+
+def test_factor_density_raster_matches_the_dense_one():
+    returns = np.random.default_rng(1).multivariate_normal(MEAN / 12, COV / 12, 240)
+    factor = factor_model(returns, 2)
+    from_factor = frontier_paper.random_portfolio_density(MEAN, factor, RF, 20_000, bins=(40, 30), block_size=5_000,
+                                                          workers=1)
+    from_dense = frontier_paper.random_portfolio_density(MEAN, factor.dense(), RF, 20_000, bins=(40, 30),
+                                                         block_size=5_000, workers=1)
+    np.testing.assert_array_equal(from_factor['counts'], from_dense['counts'])
+
+
+def _slsqp_min_variance(mean_returns, cov, target):
+    n = len(mean_returns)
+    constraints = [{'type': 'eq', 'fun': lambda w: w.sum() - 1},
+                   {'type': 'eq', 'fun': lambda w: w @ mean_returns - target}]
+    result = minimize(lambda w: w @ cov @ w, np.full(n, 1 / n), method='SLSQP', bounds=[(0, 1)] * n,
+                      constraints=constraints, options={'ftol': 1e-15, 'maxiter': 1_000})
+    return result.x
+
+
+def _random_inputs(n_assets=12, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.standard_normal((n_assets, 3)) * 0.1
+    return rng.uniform(0.02, 0.2, n_assets), factors @ factors.T + np.diag(rng.uniform(0.01, 0.05, n_assets))
+
+
+@pytest.mark.parametrize('inputs', [(MEAN, COV), _random_inputs()])
+def test_traced_frontier_matches_slsqp(inputs):
+    mean_returns, cov = inputs
+    frontier = efficient_frontier(mean_returns, cov, RF, n_points=20)
+    np.testing.assert_allclose(frontier['returns'], np.linspace(frontier['returns'][0], mean_returns.max(), 20),
+                               rtol=1e-10)
+    for i in (1, 7, 13, 18):
+        reference = _slsqp_min_variance(mean_returns, cov, frontier['returns'][i])
+        assert frontier['volatilities'][i] <= np.sqrt(reference @ cov @ reference) + 1e-10
+        np.testing.assert_allclose(frontier['weights'][i], reference, atol=1e-6)
+
+    tangency = frontier['tangency']
+    reference = max_sharpe_portfolio(mean_returns, cov, RF)
+    assert tangency['sharpe'] >= (reference @ mean_returns - RF) / np.sqrt(reference @ cov @ reference) - 1e-12
+    np.testing.assert_allclose(tangency['weights'], reference, atol=1e-6)
+    assert tangency['sharpe'] >= frontier['sharpe'].max() - 1e-12
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from scipy.stats import genpareto
+
+from zyllica.evt import bootstrap_pot
+from zyllica.gpd import fit_mle, gpd_loglik, pot_es
+
+
+@pytest.mark.parametrize('xi', [-0.2, 0.0, 0.3])
+def test_fit_mle_agrees_with_scipy(xi):
+    y = genpareto.rvs(xi, scale=0.02, size=2_000, random_state=np.random.default_rng(42))
+    xi_s, _, sigma_s = genpareto.fit(y, floc=0)
+    fit = fit_mle(y)
+    assert fit['converged']
+    assert fit['xi'] == pytest.approx(xi_s, abs=1e-3)
+    assert fit['sigma'] == pytest.approx(sigma_s, rel=1e-3)
+    # The Newton optimum is at least as good as scipy's
+    assert fit['loglik'] >= gpd_loglik(y, xi_s, sigma_s) - 1e-8
+
+
+def test_pot_es_finite_below_one():
+    assert pot_es(3.0, 1.0, 0.5, 2.0) == pytest.approx((3.0 + 2.0 - 0.5) / 0.5)
+
+
+@pytest.mark.parametrize('xi', [1.0, 1.5])
+def test_pot_es_infinite_without_a_gpd_mean(xi):
+    assert pot_es(3.0, 1.0, xi, 2.0) == np.inf
+
+
+def test_bootstrap_es_interval_with_infinite_mean_tail():
+    # Pareto losses with tail index 0.8: xi = 1.25, so resampled ES values are infinite
+    losses = np.random.default_rng(0).pareto(0.8, 2000) + 1
+    boot = bootstrap_pot(losses, n_boot=40, workers=1)
+    assert np.isinf(boot['samples']['es']).any()
+    low, high = boot['ci']['es']
+    assert not np.isnan(low) and high == np.inf
+    assert np.all(np.isfinite(boot['ci']['var']))
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+
+from zyllica.papers import PAPERS, ROOT, check_papers
+
+HEAVY = ('matplotlib', 'seaborn', 'scipy.stats', 'pandas')
+
+_PROBE = """
+import sys
+import risk_simulation
+from zyllica.papers import PAPERS, load_paper
+for paper in PAPERS:
+    load_paper(paper)
+print(' '.join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def test_loading_every_paper_leaves_plotting_unimported():
+    # A fresh interpreter: this test process may already have imported them
+    out = subprocess.run([sys.executable, '-c', _PROBE.format(heavy=HEAVY)], cwd=ROOT, capture_output=True,
+                         text=True, check=True).stdout
+    assert out.split() == []
+
+
+def test_unknown_papers_are_rejected():
+    check_papers(list(PAPERS))
+    with pytest.raises(ValueError, match='unknown paper'):
+        check_papers(['frontier', 'appendix'])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from zyllica.parallel import iter_blocks, run_blocks, split_counts
+from zyllica.stats import Histogram, Moments, QuantileSketch, merge_all
+
+
+def _normals(rng, n, scale):
+    return scale * rng.standard_normal(n)
+
+
+def _partials(rng, n):
+    values = rng.standard_normal(n)
+    moments = Moments()
+    moments.update(values)
+    hist = Histogram(np.linspace(-5, 5, 41))
+    hist.update(values)
+    return moments, hist, values
+
+
+def test_split_counts_covers_the_total():
+    assert split_counts(10, 4) == [4, 4, 2]
+    assert split_counts(8, 4) == [4, 4]
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_results_do_not_depend_on_the_worker_count(workers):
+    serial = run_blocks(_normals, 1_000, seed=7, block_size=128, workers=1, args=(2.0,))
+    pooled = run_blocks(_normals, 1_000, seed=7, block_size=128, workers=workers, args=(2.0,))
+    assert [len(block) for block in serial] == split_counts(1_000, 128)
+    for a, b in zip(serial, pooled, strict=True):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_merged_partials_match_the_pooled_sample():
+    blocks = list(iter_blocks(_partials, 5_000, seed=3, block_size=700, workers=1))
+    moments = merge_all(block[0] for block in blocks)
+    hist = merge_all(block[1] for block in blocks)
+    values = np.concatenate([block[2] for block in blocks])
+
+    dev = values - values.mean()
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert moments.variance == pytest.approx(values.var(ddof=1), rel=1e-12)
+    assert moments.skewness == pytest.approx(np.mean(dev**3) / np.mean(dev**2)**1.5, rel=1e-9)
+    assert moments.kurtosis == pytest.approx(np.mean(dev**4) / np.mean(dev**2)**2 - 3, rel=1e-9)
+    np.testing.assert_array_equal(hist.counts, np.histogram(values, hist.edges)[0])
+
+
+def test_sketch_below_its_size_is_exact():
+    values = np.random.default_rng(0).standard_normal((3, 1_000))
+    sketch = QuantileSketch(3, size=4096)
+    for chunk in np.split(values, 4, axis=1):
+        sketch.update(chunk)
+    np.testing.assert_array_equal(sketch.values, np.sort(values, axis=1))
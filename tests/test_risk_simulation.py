@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+import risk_simulation
+
+
+@pytest.mark.parametrize('sampling', ['plain', 'antithetic', 'sobol'])
+def test_log_prices_are_the_log_of_the_euler_prices(sampling):
+    args = (100, 252, 0.0005, 0.02, 2_000)
+    prices = risk_simulation.simulate_gbm_paths(*args, rng=np.random.default_rng(1), sampling=sampling)
+    log_prices = risk_simulation.simulate_gbm_paths(*args, log_prices=True, rng=np.random.default_rng(1),
+                                                    sampling=sampling)
+    np.testing.assert_allclose(np.exp(log_prices), prices, rtol=1e-12)
+
+
+def test_single_path_matches_the_vectorized_engine():
+    np.random.seed(7)
+    path = risk_simulation.monte_carlo_simulation(100, 30, 0.001, 0.02)
+    np.random.seed(7)
+    paths = risk_simulation.simulate_gbm_paths(100, 30, 0.001, 0.02, n_paths=1)
+    np.testing.assert_array_equal(path, paths[:, 0])
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from zyllica.sampling import (check_path_sampling, compare_sampling_modes, control_variate_weights,
+                              standard_normals, tail_metrics)
+
+S0, MU, SIGMA, T = 100, 0.08, 0.20, 1.0
+
+
+def _terminal(rng, n, S0, mu, sigma, T, sampling):
+    Z = standard_normals(rng, (1, n), sampling)[0]
+    return S0 * np.exp((mu - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * Z)
+
+
+def test_antithetic_shocks_mirror_each_other():
+    Z = standard_normals(np.random.default_rng(0), (5, 7), 'antithetic')
+    assert Z.shape == (5, 7)
+    np.testing.assert_array_equal(Z[:, 4:], -Z[:, :3])
+
+
+def test_sobol_shocks_are_standard_normal():
+    Z = standard_normals(np.random.default_rng(0), (2, 4096), 'sobol')
+    assert Z.shape == (2, 4096)
+    np.testing.assert_allclose(Z.mean(axis=1), 0, atol=1e-3)
+    np.testing.assert_allclose(Z.std(axis=1), 1, atol=1e-2)
+
+
+def test_unknown_and_path_only_modes_are_rejected():
+    with pytest.raises(ValueError):
+        standard_normals(np.random.default_rng(0), (1, 10), 'latin')
+    with pytest.raises(ValueError):
+        check_path_sampling('control_variate', 'terminal_tail_risk')
+
+
+def test_control_variate_weights_hit_the_expected_mean():
+    control = np.random.default_rng(1).lognormal(0, 0.3, 1_000)
+    weights = control_variate_weights(control, 1.05)
+    assert weights.sum() == pytest.approx(1.0)
+    mean, var, cvar = tail_metrics(control, 0.05, weights)
+    assert mean == pytest.approx(1.05)
+    assert cvar <= var
+
+
+def test_variance_reduction_beats_plain_monte_carlo():
+    reports = compare_sampling_modes(_terminal, (S0, MU, SIGMA, T), 32_000, S0 * np.exp(MU * T), workers=1)
+    se = {report['sampling']: report['mean_se'] for report in reports}
+    assert se['antithetic'] < se['plain']
+    assert se['sobol'] < se['plain']
+    assert se['control_variate'] < 1e-6 * se['plain']
+    sobol = next(report for report in reports if report['sampling'] == 'sobol')
+    assert sobol['var_efficiency'] > 1
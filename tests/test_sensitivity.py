@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from zyllica.sensitivity import sobol_indices
+
+A, B = 7.0, 0.1
+BOUNDS = [(-np.pi, np.pi)] * 3
+
+
+def _ishigami(x1, x2, x3):
+    return np.sin(x1) + A * np.sin(x2)**2 + B * x3**4 * np.sin(x1)
+
+
+def _ishigami_indices():
+    # Closed-form partial variances of the Ishigami function (Sobol & Levitan 1999)
+    v1 = 0.5 * (1 + B * np.pi**4 / 5)**2
+    v2 = A**2 / 8
+    v13 = 8 * B**2 * np.pi**8 / 225
+    variance = v1 + v2 + v13
+    return np.array([v1, v2, 0.0]) / variance, np.array([v1 + v13, v2, v13]) / variance
+
+
+def test_ishigami_indices_lie_in_their_intervals():
+    # 99% intervals: six 95% intervals would all cover the truth only ~74% of the time
+    first, total = _ishigami_indices()
+    result = sobol_indices(_ishigami, BOUNDS, n=20_000, n_boot=200, ci=0.99, workers=1, block_size=5_000)
+    assert result['n_evals'] == 20_000 * 5
+    for low_high, exact in [(result['first_order_ci'], first), (result['total_ci'], total)]:
+        assert np.all(low_high[:, 0] <= exact) and np.all(exact <= low_high[:, 1])
+    np.testing.assert_allclose(result['first_order'], first, atol=0.03)
+    np.testing.assert_allclose(result['total'], total, atol=0.03)
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_indices_do_not_depend_on_the_worker_count(workers):
+    kwargs = dict(n=4_000, n_boot=50, block_size=1_000)
+    serial = sobol_indices(_ishigami, BOUNDS, workers=1, **kwargs)
+    pooled = sobol_indices(_ishigami, BOUNDS, workers=workers, **kwargs)
+    for key in ('first_order', 'total', 'first_order_ci', 'total_ci'):
+        np.testing.assert_array_equal(serial[key], pooled[key])
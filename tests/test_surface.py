@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from zyllica.surface import pyramid_level, tiled_pyramid, tiled_surface
+
+
+def _risk(x, y):
+    return np.sin(3 * x) * y**2 + x * y
+
+
+def _pool(surface):
+    h, w = surface.shape[0] // 2, surface.shape[1] // 2
+    return surface[:2 * h, :2 * w].reshape(h, 2, w, 2).mean(axis=(1, 3))
+
+
+@pytest.mark.parametrize('directory', [None, 'levels'])
+def test_tiled_pyramid_matches_the_dense_meshgrid(tmp_path, directory):
+    # Odd sides and several partial tiles
+    x, y = np.linspace(0, 1, 301), np.linspace(0, 1, 267)
+    if directory is not None:
+        directory = str(tmp_path / directory)
+    levels = tiled_pyramid(_risk, x, y, min_size=32, tile=64, dtype=np.float64, directory=directory)
+    X, Y = np.meshgrid(x, y)
+    expected = _risk(X, Y)
+    assert [level.shape for level in levels] == [(267, 301), (133, 150), (66, 75), (33, 37)]
+    for level in levels:
+        np.testing.assert_allclose(level, expected, rtol=1e-12, atol=1e-15)
+        expected = _pool(expected)
+    if directory is not None:
+        np.testing.assert_array_equal(np.load(tmp_path / 'levels' / 'level_0.npy'), levels[0])
+
+
+def test_tile_must_keep_the_pooling_exact():
+    with pytest.raises(ValueError, match='multiple'):
+        tiled_pyramid(_risk, np.linspace(0, 1, 256), np.linspace(0, 1, 256), min_size=32, tile=100)
+
+
+def test_surface_and_level_selection():
+    x = y = np.linspace(0, 1, 512)
+    levels = tiled_pyramid(_risk, x, y, min_size=64, tile=128)
+    np.testing.assert_array_equal(tiled_surface(_risk, x, y, tile=128), levels[0])
+    assert pyramid_level(levels, (100, 100)).shape == (128, 128)
+    assert pyramid_level(levels, (300, 200)).shape == (512, 512)
+    assert pyramid_level(levels, (4096, 4096)) is levels[0]
@@ -0,0 +1,28 @@
+import json
+
+import numpy as np
+
+from zyllica import trace
+
+
+def test_stage_is_a_no_op_when_not_tracing():
+    with trace.stage('x') as s:
+        s.record(values=np.zeros(3))
+    assert s is trace._NULL_STAGE
+
+
+def test_tracing_without_resource_or_proc(tmp_path, monkeypatch):
+    # Windows: no ``resource`` module and no /proc, the memory / child CPU fields are None
+    monkeypatch.setattr(trace, 'resource', None)
+    monkeypatch.setattr(trace, '_STATUS', str(tmp_path / 'missing'))
+    monkeypatch.setattr(trace, '_CLEAR_REFS', str(tmp_path / 'missing'))
+    path = tmp_path / 'trace.json'
+    with trace.tracing(str(path)):
+        with trace.stage('outer'):
+            with trace.stage('inner') as s:
+                s.record(values=np.zeros((2, 3)))
+    events = [e for e in json.loads(path.read_text())['traceEvents'] if e['ph'] == 'X']
+    assert [e['name'] for e in events] == ['inner', 'outer']
+    inner = events[0]['args']
+    assert inner['rss'] is None and inner['peak_rss'] is None and inner['cpu_children'] is None
+    assert inner['arrays']['values'] == {'shape': [2, 3], 'dtype': 'float64', 'bytes': 48}
@@ -0,0 +1 @@
+"""Shared computational layer for the Zyllica papers."""
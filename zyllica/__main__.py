@@ -0,0 +1,5 @@
+import sys
+
+from zyllica.cli import main
+
+sys.exit(main())
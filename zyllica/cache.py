@@ -0,0 +1,113 @@
+"""Content-addressed on-disk cache for simulated arrays.
+
+Arrays are stored as ``.npy`` files named after a hash of
+``(model, parameters, seed, sims, dtype)`` and read back through
+``np.load(..., mmap_mode='r')``, so repeat runs and plotting stages get a
+zero-copy, read-only ``np.memmap`` instead of simulating again. The cache
+directory is capped in bytes and evicts least recently used entries.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'zyllica')
+
+
+def _canonical(value):
+    """JSON-friendly, order-stable form of a parameter value."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {'dtype': str(value.dtype), 'shape': value.shape, 'data': value.tolist()}
+    if isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+
+class SimulationCache:
+    """Size-bounded LRU cache of ``.npy`` arrays opened as memory maps."""
+
+    def __init__(self, root=None, max_bytes=4 * 1024**3):
+        self.root = root or os.environ.get('ZYLLICA_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(model, params, seed, sims, dtype):
+        payload = json.dumps(_canonical({
+            'model': model, 'params': params, 'seed': seed,
+            'sims': sims, 'dtype': np.dtype(dtype).str,
+        }), sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, f'{key}.npy')
+
+    def get(self, model, params, seed, sims, dtype=np.float64):
+        """Memory-mapped array for this key, or None on a miss."""
+        path = self._path(self.key(model, params, seed, sims, dtype))
+        try:
+            array = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)  # mark as recently used
+        return array
+
+    def put(self, model, params, seed, sims, array, dtype=np.float64):
+        """Store ``array`` (cast to ``dtype``) and return it memory-mapped."""
+        path = self._path(self.key(model, params, seed, sims, dtype))
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as fh:
+            np.save(fh, np.asarray(array, dtype=dtype))
+        os.replace(tmp, path)
+        self.evict(keep=path)
+        return np.load(path, mmap_mode='r')
+
+    def get_or_create(self, model, params, seed, sims, factory, dtype=np.float64):
+        """Cached array, calling ``factory()`` to simulate it on a miss."""
+        array = self.get(model, params, seed, sims, dtype)
+        if array is None:
+            array = self.put(model, params, seed, sims, factory(), dtype)
+        return array
+
+    def entries(self):
+        """(mtime, size, path) of every stored array, least recently used first."""
+        found = []
+        for name in os.listdir(self.root):
+            if name.endswith('.npy'):
+                path = os.path.join(self.root, name)
+                stat = os.stat(path)
+                found.append((stat.st_mtime, stat.st_size, path))
+        return sorted(found)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Drop least recently used arrays until the cache fits in ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+
+
+def cached(cache, model, params, seed, sims, factory, dtype=np.float64):
+    """``cache.get_or_create`` that falls back to ``factory()`` when cache is None."""
+    if cache is None:
+        return factory()
+    return cache.get_or_create(model, params, seed, sims, factory, dtype)
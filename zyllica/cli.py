@@ -0,0 +1,130 @@
+"""Command line entry point.
+
+    python -m zyllica run <paper> [--sims N] [--seed S] [--workers W] [--headless [--out DIR]]
+                                     [--timings FILE] [--trace FILE [--trace-allocations]]
+    python -m zyllica render [paper ...] [--out DIR] [--workers N] [--formats png svg]
+    python -m zyllica papers
+
+``run`` imports one paper script and calls its entry points with the given
+simulation count, seed and worker count (each passed only to entry points
+that take it). It reports how long the process took to start, how long the
+script import took and whether that import pulled in matplotlib, then the
+time of every entry point; ``--timings`` also writes these as JSON.
+``--headless`` renders with Agg and routes every figure the script shows or
+saves to ``<out>/<paper>/`` (``build/figures`` by default, as ``render``).
+``--trace`` records the script's stages (see ``zyllica.trace``): a ``.jsonl``
+file gets JSON lines, any other name a Chrome trace.
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import sys
+import time
+
+from zyllica.papers import PAPERS, load_paper
+from zyllica.trace import tracing
+
+_START = time.perf_counter()
+
+
+def _process_seconds():
+    """Seconds since this process started (Linux ``/proc``; None elsewhere)."""
+    try:
+        with open('/proc/self/stat') as fh:
+            start_ticks = int(fh.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as fh:
+            uptime = float(fh.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+
+
+def _entry_kwargs(func, options):
+    params = inspect.signature(func).parameters
+    return {name: value for name, value in options.items() if value is not None and name in params}
+
+
+def run_paper(paper, sims=None, seed=None, workers=None):
+    """Import ``paper`` and call its entry points; returns the timing report."""
+    script, entries, sims_param = PAPERS[paper]
+    if sims is not None and sims_param is None:
+        raise ValueError(f'paper {paper!r} has no simulation count')
+    report = {'paper': paper, 'startup_seconds': _process_seconds(), 'cli_seconds': time.perf_counter() - _START}
+
+    plotting_before = 'matplotlib' in sys.modules
+    start = time.perf_counter()
+    module = load_paper(paper)
+    report['import_seconds'] = time.perf_counter() - start
+    report['import_loaded_matplotlib'] = not plotting_before and 'matplotlib' in sys.modules
+
+    options = {sims_param: sims, 'seed': seed, 'workers': workers}
+    report['entries'] = []
+    for entry in entries:
+        func = getattr(module, entry)
+        start = time.perf_counter()
+        func(**_entry_kwargs(func, options))
+        report['entries'].append({'entry': entry, 'seconds': time.perf_counter() - start})
+    return report
+
+
+def _run(args):
+    with contextlib.ExitStack() as stack:
+        if args.headless:
+            os.environ['MPLBACKEND'] = 'Agg'
+            from zyllica.render import figure_sink
+            sink = stack.enter_context(figure_sink(args.paper, args.out, ('png',)))
+        if args.trace:
+            # Absolute: the headless run changes into the figure directory
+            stack.enter_context(tracing(os.path.abspath(args.trace), allocations=args.trace_allocations))
+        report = run_paper(args.paper, args.sims, args.seed, args.workers)
+    startup = report['startup_seconds']
+    print(f"startup {'n/a' if startup is None else f'{startup:.3f} s'} "
+          f"(zyllica CLI ready after {report['cli_seconds']:.3f} s)")
+    print(f"import  {report['import_seconds']:.3f} s "
+          f"(matplotlib {'loaded' if report['import_loaded_matplotlib'] else 'not loaded'})")
+    for record in report['entries']:
+        print(f"{record['entry']:<44} {record['seconds']:>8.2f} s")
+    if args.headless:
+        print(f"figures {len(sink.records)} -> {os.path.join(os.path.abspath(args.out), args.paper)}")
+    if args.timings:
+        with open(args.timings, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    if args.trace:
+        print(f'trace   {args.trace}')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m zyllica', description='Zyllica paper models.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run one paper and report import / startup / run times')
+    run.add_argument('paper', choices=list(PAPERS))
+    run.add_argument('--sims', type=int, default=None, help="simulation count (default: the paper's own)")
+    run.add_argument('--seed', type=int, default=None, help="random seed (default: the paper's own)")
+    run.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    run.add_argument('--headless', action='store_true',
+                     help='use the Agg backend and save every figure under --out instead of showing it')
+    run.add_argument('--out', default='build/figures', help='figure directory for --headless (default: build/figures)')
+    run.add_argument('--timings', default=None, help='write the timing report to this JSON file')
+    run.add_argument('--trace', default=None, help='record stage timings and memory (.jsonl or Chrome trace)')
+    run.add_argument('--trace-allocations', action='store_true', help='also track tracemalloc peaks per stage')
+
+    commands.add_parser('render', add_help=False, help='render every paper figure headless (see zyllica.render)')
+    commands.add_parser('papers', help='list the papers')
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == 'render':
+        from zyllica.render import main as render_main
+        return render_main(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    if args.command == 'papers':
+        for paper, (script, entries, sims_param) in PAPERS.items():
+            print(f"{paper:<22} {script:<44} sims={sims_param or '-'}")
+        return 0
+    if args.sims is not None and PAPERS[args.paper][2] is None:
+        parser.error(f'paper {args.paper!r} has no simulation count (--sims)')
+    return _run(args)
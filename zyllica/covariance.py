@@ -0,0 +1,210 @@
+"""Covariance representations for large asset universes.
+
+The optimizer and the random-portfolio cloud only need a few operations on
+the covariance: products ``C w`` (portfolio variance and its gradient ``2 C
+w``), per-row variances of a batch of weight vectors, and solves against the
+principal submatrix of the currently held assets. ``DenseCovariance``
+provides them for an explicit matrix (optionally Ledoit-Wolf shrunk);
+``FactorCovariance`` for ``B F B' + D`` with ``k`` factors, at O(n k) per
+product and O(|F| k^2) per solve (Woodbury), never forming the ``n x n``
+matrix. Plain arrays are accepted everywhere through ``as_covariance``.
+"""
+import numpy as np
+
+
+class Covariance:
+    """Common interface; subclasses implement ``matvec``, ``batch_variance``, ``solve``,
+    ``diagonal``, ``dense``, ``sample_returns`` and ``refit``."""
+
+    @property
+    def n_assets(self):
+        raise NotImplementedError
+
+    def matvec(self, weights):
+        """``C w`` for one weight vector, or ``W C`` for a ``[portfolios x assets]`` batch."""
+        raise NotImplementedError
+
+    def batch_variance(self, weights):
+        """``w_i' C w_i`` for every row of a ``[portfolios x assets]`` batch."""
+        raise NotImplementedError
+
+    def solve(self, idx, rhs):
+        """``C[idx, idx]^-1 rhs`` for the principal submatrix on assets ``idx``."""
+        raise NotImplementedError
+
+    def diagonal(self):
+        """Asset variances."""
+        raise NotImplementedError
+
+    def dense(self):
+        raise NotImplementedError
+
+    def sample_returns(self, rng, n_obs):
+        """``[n_obs x assets]`` zero-mean Gaussian returns with this covariance."""
+        raise NotImplementedError
+
+    def refit(self, returns):
+        """The same representation estimated from a ``[observations x assets]`` return sample."""
+        raise NotImplementedError
+
+    def variance(self, weights):
+        return weights @ self.matvec(weights)
+
+    def volatility(self, weights):
+        return np.sqrt(self.variance(weights))
+
+    def gradient(self, weights):
+        """Gradient of the portfolio variance, ``2 C w``."""
+        return 2 * self.matvec(weights)
+
+
+class DenseCovariance(Covariance):
+    """Explicit ``n x n`` covariance matrix.
+
+    ``estimator`` names how ``refit`` re-estimates it from a return sample:
+    ``'sample'`` (the biased sample covariance, which needs more observations
+    than assets) or ``'ledoit_wolf'`` (shrunk again with ``ledoit_wolf``).
+    """
+
+    ESTIMATORS = ('sample', 'ledoit_wolf')
+
+    def __init__(self, matrix, estimator='sample'):
+        if estimator not in self.ESTIMATORS:
+            raise ValueError(f"unknown estimator {estimator!r}; expected one of {self.ESTIMATORS}")
+        self.matrix = np.asarray(matrix, dtype=float)
+        self.estimator = estimator
+        self._chol = None
+
+    @property
+    def n_assets(self):
+        return len(self.matrix)
+
+    def matvec(self, weights):
+        return weights @ self.matrix  # symmetric, so W C == (C W')'
+
+    def batch_variance(self, weights):
+        return np.einsum('ij,ij->i', weights @ self.matrix, weights)
+
+    def solve(self, idx, rhs):
+        return np.linalg.solve(self.matrix[np.ix_(idx, idx)], rhs)
+
+    def diagonal(self):
+        return np.diag(self.matrix)
+
+    def dense(self):
+        return self.matrix
+
+    def sample_returns(self, rng, n_obs):
+        if self._chol is None:
+            self._chol = np.linalg.cholesky(self.matrix)
+        return rng.standard_normal((n_obs, self.n_assets)) @ self._chol.T
+
+    def refit(self, returns):
+        if self.estimator == 'ledoit_wolf':
+            return ledoit_wolf(returns)[0]
+        n_obs = len(returns)
+        if n_obs <= self.n_assets:
+            raise ValueError(f'the sample covariance of {n_obs} observations of {self.n_assets} assets is '
+                             f'singular; use ledoit_wolf or factor_model for n_obs <= n_assets')
+        return DenseCovariance(np.cov(returns, rowvar=False, bias=True))
+
+
+class FactorCovariance(Covariance):
+    """Low-rank factor plus diagonal covariance ``B F B' + diag(d)``.
+
+    Parameters
+    ----------
+    loadings : ndarray
+        Factor exposures ``B``, ``[assets x factors]``.
+    factor_cov : ndarray, optional
+        Factor covariance ``F`` (``[factors x factors]``); identity by default.
+    specific_var : ndarray
+        Idiosyncratic variances ``d`` (strictly positive).
+    """
+
+    def __init__(self, loadings, factor_cov=None, specific_var=None):
+        self.loadings = np.asarray(loadings, dtype=float)
+        k = self.loadings.shape[1]
+        self.factor_cov = np.eye(k) if factor_cov is None else np.asarray(factor_cov, dtype=float)
+        self.specific_var = np.asarray(specific_var, dtype=float)
+
+    @property
+    def n_assets(self):
+        return len(self.loadings)
+
+    @property
+    def n_factors(self):
+        return self.loadings.shape[1]
+
+    def matvec(self, weights):
+        exposure = weights @ self.loadings
+        return (exposure @ self.factor_cov) @ self.loadings.T + weights * self.specific_var
+
+    def batch_variance(self, weights):
+        exposure = weights @ self.loadings
+        return np.einsum('ij,ij->i', exposure @ self.factor_cov, exposure) + (weights**2) @ self.specific_var
+
+    def solve(self, idx, rhs):
+        # Woodbury: (D + B F B')^-1 = D^-1 - D^-1 B (F^-1 + B' D^-1 B)^-1 B' D^-1
+        B = self.loadings[idx]
+        d_inv = 1.0 / self.specific_var[idx]
+        y = d_inv[:, None] * rhs.reshape(len(idx), -1)
+        core = np.linalg.inv(self.factor_cov) + (B.T * d_inv) @ B
+        x = y - d_inv[:, None] * (B @ np.linalg.solve(core, B.T @ y))
+        return x.reshape(rhs.shape)
+
+    def diagonal(self):
+        return np.sum((self.loadings @ self.factor_cov) * self.loadings, axis=1) + self.specific_var
+
+    def dense(self):
+        return self.loadings @ self.factor_cov @ self.loadings.T + np.diag(self.specific_var)
+
+    def sample_returns(self, rng, n_obs):
+        factors = rng.standard_normal((n_obs, self.n_factors)) @ np.linalg.cholesky(self.factor_cov).T
+        specific = rng.standard_normal((n_obs, self.n_assets)) * np.sqrt(self.specific_var)
+        return factors @ self.loadings.T + specific
+
+    def refit(self, returns):
+        return factor_model(returns, self.n_factors)
+
+
+def as_covariance(cov):
+    """Wrap a plain matrix as ``DenseCovariance``; pass ``Covariance`` objects through."""
+    return cov if isinstance(cov, Covariance) else DenseCovariance(cov)
+
+
+def ledoit_wolf(returns):
+    """Ledoit-Wolf (2004) shrinkage towards a scaled identity; returns (DenseCovariance, shrinkage).
+
+    ``returns`` is ``[observations x assets]``. The shrunk matrix is well
+    conditioned even when there are more assets than observations, and
+    ``refit`` shrinks every re-estimate the same way.
+    """
+    X = np.asarray(returns, dtype=float)
+    X = X - X.mean(axis=0)
+    T, n = X.shape
+    S = X.T @ X / T
+    mu = np.trace(S) / n
+    delta = np.sum(S**2) - 2 * mu * np.trace(S) + n * mu**2           # ||S - mu I||_F^2
+    beta = (np.sum(np.sum(X**2, axis=1)**2) - T * np.sum(S**2)) / T**2  # sum_t ||x_t x_t' - S||_F^2 / T^2
+    shrinkage = min(beta, delta) / delta if delta > 0 else 1.0
+    S *= 1 - shrinkage
+    S[np.diag_indices(n)] += shrinkage * mu
+    return DenseCovariance(S, estimator='ledoit_wolf'), shrinkage
+
+
+def factor_model(returns, n_factors):
+    """Statistical (principal component) factor model fitted without forming the ``n x n`` matrix.
+
+    Loadings are the top ``n_factors`` principal directions scaled by their
+    standard deviations (``F = I``); specific variances are the residual
+    diagonal, floored at a small fraction of the average variance.
+    """
+    X = np.asarray(returns, dtype=float)
+    X = X - X.mean(axis=0)
+    T = len(X)
+    _, s, vt = np.linalg.svd(X, full_matrices=False)
+    loadings = vt[:n_factors].T * (s[:n_factors] / np.sqrt(T))
+    total_var = np.mean(X**2, axis=0)
+    specific_var = np.maximum(total_var - np.sum(loadings**2, axis=1), 1e-6 * total_var.mean())
+    return FactorCovariance(loadings, specific_var=specific_var)
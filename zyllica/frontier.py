@@ -0,0 +1,284 @@
+"""Mean-variance efficient frontier with analytic gradients and warm starts.
+
+The frontier is traced from the minimum-variance portfolio up to the highest
+attainable return. For each target return the long-only minimum-variance
+problem is solved as an equality-constrained QP on the set of held ("free")
+assets: the KKT system ``C_FF w_F = [1 mu_F] lambda`` with the budget and
+target constraints is solved in closed form, and assets enter or leave the
+free set until the analytic gradient ``C w`` satisfies the optimality
+conditions for every excluded asset. Each target starts from the previous
+target's free set, which usually changes by at most one asset, so most points
+cost a single ``|F| x |F|`` solve. SLSQP with the analytic Jacobians of
+``portfolio_volatility`` / ``portfolio_return`` is the fallback.
+
+The covariance may be a plain matrix or any ``zyllica.covariance.Covariance``
+(e.g. a factor model), whose products and subset solves avoid ``n x n`` work.
+
+``resampled_frontier`` is Michaud's resampled frontier: frontiers of many
+perturbed (mean, covariance) estimates, solved in blocks on the process pool,
+averaged rank by rank, with the dispersion of the weights.
+"""
+import numpy as np
+
+from zyllica.covariance import as_covariance
+from zyllica.lazy import lazy_import
+from zyllica.parallel import iter_blocks
+from zyllica.stats import Moments, merge_all
+
+sco = lazy_import('scipy.optimize')  # only the SLSQP fallback needs it
+
+# Weights and reduced gradients within this of zero count as on the bound
+_KKT_TOL = 1e-12
+
+
+def portfolio_return(weights, mean_returns):
+    return weights @ mean_returns
+
+
+def portfolio_volatility(weights, cov_matrix):
+    return as_covariance(cov_matrix).volatility(weights)
+
+
+def portfolio_volatility_grad(weights, cov_matrix):
+    """d sigma / d w = C w / sigma (the return gradient is simply ``mean_returns``)."""
+    return _volatility_and_grad(weights, as_covariance(cov_matrix))[1]
+
+
+def _volatility_and_grad(weights, cov):
+    cov_w = cov.matvec(weights)
+    vol = np.sqrt(weights @ cov_w)
+    return vol, cov_w / vol
+
+
+def _neg_sharpe_and_grad(weights, mean_returns, cov, rf):
+    vol, vol_grad = _volatility_and_grad(weights, cov)
+    excess = weights @ mean_returns - rf
+    return -excess / vol, -(mean_returns * vol - excess * vol_grad) / vol**2
+
+
+def _slsqp(fun, x0, args, constraints, long_only):
+    n_assets = len(x0)
+    budget = {'type': 'eq', 'fun': lambda w: w.sum() - 1, 'jac': lambda w: np.ones(n_assets)}
+    bounds = [(0, 1)] * n_assets if long_only else None
+    result = sco.minimize(fun, x0, args=args, jac=True, method='SLSQP', bounds=bounds,
+                          constraints=[budget] + constraints, options={'ftol': 1e-12, 'maxiter': 500})
+    return result.x
+
+
+def _kkt_solve(cov, A, b, free):
+    """Minimum of 0.5 w'Cw subject to A'w = b with only the ``free`` assets held."""
+    A_free = A[free]
+    X = cov.solve(free, A_free)
+    # lstsq copes with a singular A_F'C_FF^-1 A_F (e.g. a single free asset)
+    lam = np.linalg.lstsq(A_free.T @ X, b, rcond=None)[0]
+    weights = np.zeros(len(A))
+    weights[free] = X @ lam
+    return weights, lam
+
+
+def _active_set(cov, A, b, free, max_iter):
+    """Long-only QP min 0.5 w'Cw, A'w = b, w >= 0 by free-set iteration; (weights, free) or None."""
+    free = free.copy()
+    for _ in range(max_iter):
+        weights, lam = _kkt_solve(cov, A, b, np.flatnonzero(free))
+        negative = np.where(free, weights, 0.0)
+        i = np.argmin(negative)
+        if negative[i] < -_KKT_TOL:
+            free[i] = False
+            if not free.any():
+                return None
+            continue
+        # Reduced gradient C w - A lambda on the bound assets must be non-negative
+        reduced = np.where(free, 0.0, cov.matvec(weights) - A @ lam)
+        j = np.argmin(reduced)
+        if reduced[j] >= -_KKT_TOL * max(1.0, np.abs(reduced).max()):
+            return np.maximum(weights, 0.0), free
+        free[j] = True
+    return None
+
+
+def _min_variance(cov, mean_returns, target, free, long_only):
+    """Minimum-variance portfolio (at ``target`` return if given) and its free set."""
+    n_assets = len(mean_returns)
+    if target is None:
+        A, b = np.ones((n_assets, 1)), np.array([1.0])
+    else:
+        A, b = np.column_stack([np.ones(n_assets), mean_returns]), np.array([1.0, target])
+    if not long_only:
+        return _kkt_solve(cov, A, b, np.arange(n_assets))[0], free
+    if target is not None and target >= mean_returns.max():
+        # Only the top-return asset reaches this target (its multipliers are not unique)
+        top = mean_returns.argmax()
+        return np.eye(n_assets)[top], np.arange(n_assets) == top
+    solved = _active_set(cov, A, b, free, max_iter=2 * n_assets + 10)
+    if solved is not None:
+        return solved
+    on_target = [] if target is None else [
+        {'type': 'eq', 'fun': lambda w: w @ mean_returns - target, 'jac': lambda w: mean_returns}]
+    x0 = np.where(free, 1.0, 0.0) / free.sum()
+    weights = _slsqp(_volatility_and_grad, x0, (cov,), on_target, long_only)
+    return weights, weights > _KKT_TOL
+
+
+def max_sharpe_portfolio(mean_returns, cov_matrix, rf=0.0, x0=None, long_only=True):
+    """Tangency (maximum Sharpe) weights by SLSQP with analytic gradient, warm-started from ``x0``."""
+    n_assets = len(mean_returns)
+    x0 = np.full(n_assets, 1.0 / n_assets) if x0 is None else x0
+    return _slsqp(_neg_sharpe_and_grad, x0, (mean_returns, as_covariance(cov_matrix), rf), [], long_only)
+
+
+def _tangency(cov, mean_returns, rf, free, long_only):
+    """Tangency weights: min z'Cz with (mu - rf)'z = 1 (z >= 0), rescaled to w = z / sum(z)."""
+    n_assets = len(mean_returns)
+    A, b = (mean_returns - rf)[:, None], np.array([1.0])
+    if not long_only:
+        z = _kkt_solve(cov, A, b, np.arange(n_assets))[0]
+    else:
+        solved = _active_set(cov, A, b, free, max_iter=2 * n_assets + 10)
+        if solved is None:
+            return None
+        z = solved[0]
+    return z / z.sum() if z.sum() > 0 else None
+
+
+def efficient_frontier(mean_returns, cov_matrix, rf=0.0, n_points=200, long_only=True, x0=None):
+    """Trace the efficient frontier and its tangency portfolio.
+
+    Parameters
+    ----------
+    mean_returns : array_like
+        Expected asset returns.
+    cov_matrix : ndarray or Covariance
+        Asset covariance (positive definite): a dense matrix, or a
+        ``DenseCovariance`` / ``FactorCovariance`` from ``zyllica.covariance``.
+    rf : float
+        Risk-free rate for the Sharpe ratios and the tangency portfolio.
+    n_points : int
+        Target returns, evenly spaced from the minimum-variance return to the
+        highest attainable one.
+    long_only : bool
+        ``w >= 0`` with full investment (the paper's setting); otherwise only
+        the budget constraint applies and every point is a single KKT solve.
+    x0 : array_like, optional
+        Warm start, e.g. the minimum-variance weights of a nearby problem: the
+        assets it holds seed the first active-set solve.
+
+    Returns
+    -------
+    dict with per-point ``returns``, ``volatilities``, ``sharpe`` and
+    ``weights`` (``[n_points x assets]``), plus the ``min_variance`` and
+    ``tangency`` portfolios (each a dict of ``weights``, ``ret``, ``vol``,
+    ``sharpe``).
+    """
+    mean_returns = np.asarray(mean_returns, dtype=float)
+    cov = as_covariance(cov_matrix)
+    n_assets = len(mean_returns)
+
+    def summary(weights):
+        ret = portfolio_return(weights, mean_returns)
+        vol = cov.volatility(weights)
+        return {'weights': weights, 'ret': ret, 'vol': vol, 'sharpe': (ret - rf) / vol}
+
+    # Left end: global minimum-variance portfolio
+    free = np.ones(n_assets, dtype=bool) if x0 is None else np.asarray(x0) > _KKT_TOL
+    mv_weights, free = _min_variance(cov, mean_returns, None, free, long_only)
+    min_variance = summary(mv_weights)
+
+    # Right end: the best single asset when long-only; unbounded otherwise, so span the asset range
+    top = mean_returns.max() if long_only else max(mean_returns.max(), 2 * min_variance['ret'])
+    targets = np.linspace(min_variance['ret'], top, n_points)
+
+    weights = np.empty((n_points, n_assets))
+    for i, target in enumerate(targets):
+        weights[i], free = _min_variance(cov, mean_returns, target, free, long_only)
+
+    returns = weights @ mean_returns
+    volatilities = np.sqrt(cov.batch_variance(weights))
+    sharpe = (returns - rf) / volatilities
+
+    # Tangency, warm-started from the free set of the best frontier point
+    best = weights[np.argmax(sharpe)]
+    tangency = _tangency(cov, mean_returns, rf, best > _KKT_TOL, long_only)
+    if tangency is None:
+        tangency = max_sharpe_portfolio(mean_returns, cov, rf, best, long_only)
+
+    return {
+        'returns': returns,
+        'volatilities': volatilities,
+        'sharpe': sharpe,
+        'weights': weights,
+        'min_variance': min_variance,
+        'tangency': summary(tangency),
+    }
+
+
+def _resample_block(rng, n, mean_returns, cov, n_obs, rf, n_points, long_only):
+    """Frontiers of ``n`` perturbed input sets; each solve warm-starts from the previous one."""
+    frontier_weights = np.empty((n, n_points, len(mean_returns)))
+    tangency = np.empty((n, len(mean_returns)))
+    x0 = None
+    for i in range(n):
+        # Estimates from n_obs returns drawn from the reference inputs
+        sample = mean_returns + cov.sample_returns(rng, n_obs)
+        frontier = efficient_frontier(sample.mean(axis=0), cov.refit(sample), rf, n_points, long_only, x0)
+        frontier_weights[i] = frontier['weights']
+        tangency[i] = frontier['tangency']['weights']
+        x0 = frontier['min_variance']['weights']
+    frontier_moments = Moments()
+    frontier_moments.update(frontier_weights, axis=0)
+    return frontier_moments, tangency
+
+
+def resampled_frontier(mean_returns, cov_matrix, rf=0.0, n_obs=60, n_resamples=500, n_points=50,
+                       long_only=True, ci=0.90, seed=42, workers=None, block_size=25):
+    """Resampled (Michaud) efficient frontier and tangency portfolio.
+
+    Every resample draws ``n_obs`` Gaussian returns from the reference inputs,
+    re-estimates the mean and the covariance (with the same estimator: a
+    Ledoit-Wolf matrix is shrunk again, a factor model refitted as one; the
+    plain sample covariance needs ``n_obs > assets``) and traces the frontier. Resamples
+    run in blocks of ``block_size`` on the process pool; within a block each
+    solve warm-starts from the previous one. Frontier weights are averaged rank
+    by rank (point ``i`` of every resampled frontier) and the tangency weights
+    across resamples.
+
+    Returns a dict with the averaged frontier ``weights`` and their standard
+    deviation ``weights_std`` (``[n_points x assets]``), its ``returns``,
+    ``volatilities`` and ``sharpe`` under the reference inputs, and
+    ``tangency``: the averaged portfolio (``weights``, ``ret``, ``vol``,
+    ``sharpe``) with ``weights_std``, the ``ci`` percentile band ``weights_ci``
+    (``[2 x assets]``) and the per-resample ``samples``.
+    """
+    mean_returns = np.asarray(mean_returns, dtype=float)
+    cov = as_covariance(cov_matrix)
+    blocks = iter_blocks(_resample_block, n_resamples, seed, block_size=block_size, workers=workers,
+                         args=(mean_returns, cov, n_obs, rf, n_points, long_only))
+    moments, samples = [], []
+    for block_moments, block_tangency in blocks:
+        moments.append(block_moments)
+        samples.append(block_tangency)
+    frontier = merge_all(moments)
+    samples = np.vstack(samples)
+
+    weights = frontier.mean
+    returns = weights @ mean_returns
+    volatilities = np.sqrt(cov.batch_variance(weights))
+    tangency = samples.mean(axis=0)
+    tan_ret, tan_vol = tangency @ mean_returns, cov.volatility(tangency)
+    tails = 100 * np.array([(1 - ci) / 2, (1 + ci) / 2])
+    return {
+        'weights': weights,
+        'weights_std': frontier.std,
+        'returns': returns,
+        'volatilities': volatilities,
+        'sharpe': (returns - rf) / volatilities,
+        'tangency': {
+            'weights': tangency,
+            'ret': tan_ret,
+            'vol': tan_vol,
+            'sharpe': (tan_ret - rf) / tan_vol,
+            'weights_std': samples.std(axis=0),
+            'weights_ci': np.percentile(samples, tails, axis=0),
+            'samples': samples,
+        },
+    }
@@ -0,0 +1,42 @@
+"""Deferred imports for heavy modules.
+
+Importing ``matplotlib.pyplot`` (~0.4 s), ``seaborn`` (~1 s), ``scipy.stats``
+(~0.7 s) or ``scipy.optimize`` at module level makes every process that only
+needs a compute function pay for them. ``lazy_import(name)`` returns a stand-in
+that imports the module on first attribute access, so modules can keep the
+familiar ``plt = lazy_import('matplotlib.pyplot')`` / ``plt.subplots(...)``
+spelling while only the code paths that actually plot (or fit) load it.
+"""
+import importlib
+import sys
+
+
+class LazyModule:
+    """Proxy for module ``name``; the import happens on first attribute access."""
+
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def lazy_import(name):
+    """Module ``name`` if already imported, else a ``LazyModule`` for it."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
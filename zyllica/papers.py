@@ -0,0 +1,52 @@
+"""Registry of the paper scripts and an importer for them.
+
+The scripts live in per-paper folders whose names are not valid package
+names, so ``load_paper`` imports them by path (once per process, as
+``zyllica_paper_<paper>``). Plotting libraries and scipy.stats are imported
+lazily by the scripts and figure styles are applied per call, so loading a
+paper to call its compute functions (e.g. ``load_paper('evt').simulate_losses``)
+does not import matplotlib or restyle the process.
+"""
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# paper -> (script relative to the repository root, entry points called in order,
+#           parameter of the entry points holding the simulation count or None)
+PAPERS = {
+    'cone_of_uncertainty': ('Beyond the Average/ConeOfUncertainty.py', ['generate_stochastic_forecast_plots'],
+                            'sims'),
+    'covid_sensitivity': ('COVID19/COVID19_1_SensivityAnalysis.py',
+                          ['generate_policy_sensitivity_plot', 'generate_sobol_indices_plot'], 'n'),
+    'covid_death_zone': ('COVID19/COVID19_2_DeathZone.py', ['generate_landscape_heatmap'], None),
+    'covid_monte_carlo': ('COVID19/COVID19_3_MonteCarloSimulation.py', ['generate_monte_carlo_tail_risk'], 'N'),
+    'frontier': ('Capital Allocation/Frontier.py', ['generate_perfected_plots'], 'num_ports'),
+    'corona': ('CoronaPaper/CoronaGraphs.py', ['generate_final_english_graphs'], None),
+    'ead': ('EAD /EAD Graphs.py', ['generate_risk_architecture_plots_final_v19'], 'n_scenarios'),
+    'evt': ('Ruin Model EVT/EVT.py', ['generate_clean_evt_plots', 'generate_threshold_stability_plots'], 'n'),
+}
+
+
+def check_papers(papers):
+    """Raise ValueError for names not in ``PAPERS``."""
+    unknown = set(papers) - set(PAPERS)
+    if unknown:
+        raise ValueError(f'unknown paper(s) {sorted(unknown)}; expected some of {list(PAPERS)}')
+
+
+def load_paper(paper):
+    """The script module of ``paper`` (imported on first use, then reused)."""
+    check_papers([paper])
+    name = f'zyllica_paper_{paper}'
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, PAPERS[paper][0]))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return sys.modules[name]
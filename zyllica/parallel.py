@@ -0,0 +1,93 @@
+"""Process-pool execution with reproducible per-block random streams.
+
+Work is cut into fixed-size blocks and every block gets its own
+``numpy.random.Generator`` spawned from a single ``SeedSequence``. The block
+layout depends only on ``(total, block_size)``, never on the number of
+workers, so a given seed reproduces bit-identical results on 1 core or 32.
+"""
+import collections
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Tasks submitted ahead per worker: enough to keep the pool busy, few enough that
+# at most ``workers * IN_FLIGHT_PER_WORKER`` results exist before they are consumed
+IN_FLIGHT_PER_WORKER = 2
+
+
+def split_counts(total, block_size):
+    """Sizes of the blocks covering ``total`` items (last block may be shorter)."""
+    full, rest = divmod(int(total), int(block_size))
+    return [int(block_size)] * full + ([rest] if rest else [])
+
+
+def spawn_seeds(seed, n):
+    """``n`` independent child ``SeedSequence`` objects derived from ``seed``.
+
+    ``seed`` may be an int or an existing ``SeedSequence`` (e.g. one of several
+    streams a script splits off for independent populations).
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n)
+
+
+def _run_block(task):
+    func, child_seed, n, args = task
+    return func(np.random.default_rng(child_seed), n, *args)
+
+
+def parallel_imap(func, tasks, workers=None):
+    """Ordered lazy ``map`` over a process pool; runs inline for one worker or task.
+
+    At most ``workers * IN_FLIGHT_PER_WORKER`` tasks are submitted ahead of the
+    consumer: the next one is submitted as each result is yielded, so results
+    never pile up in the parent faster than they are used.
+    """
+    tasks = list(tasks)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        yield from map(func, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = iter(tasks)
+        window = collections.deque(pool.submit(func, task)
+                                   for task in itertools.islice(pending, workers * IN_FLIGHT_PER_WORKER))
+        try:
+            while window:
+                result = window.popleft().result()
+                for task in itertools.islice(pending, 1):
+                    window.append(pool.submit(func, task))
+                yield result
+        finally:
+            for future in window:
+                future.cancel()
+
+
+def parallel_map(func, tasks, workers=None):
+    """Eager version of ``parallel_imap``."""
+    return list(parallel_imap(func, tasks, workers))
+
+
+def iter_blocks(func, total, seed=42, block_size=100_000, workers=None, args=()):
+    """Yield ``func(rng, n, *args)`` for every block of ``total`` draws, in block order.
+
+    ``func`` must be a module-level callable so it can be pickled into worker
+    processes. Consuming the results as they arrive (e.g. merging sketches)
+    keeps memory bounded by the in-flight blocks (``workers *
+    IN_FLIGHT_PER_WORKER`` of them, see ``parallel_imap``) rather than the
+    whole run.
+    """
+    counts = split_counts(total, block_size)
+    seeds = spawn_seeds(seed, len(counts))
+    tasks = [(func, s, n, tuple(args)) for s, n in zip(seeds, counts)]
+    return parallel_imap(_run_block, tasks, workers)
+
+
+def run_blocks(func, total, seed=42, block_size=100_000, workers=None, args=()):
+    """Eager version of ``iter_blocks``: the list of per-block results."""
+    return list(iter_blocks(func, total, seed, block_size, workers, args))
@@ -0,0 +1,168 @@
+"""Incremental stage pipelines (simulate -> fit -> metrics -> plot) memoized on disk.
+
+A ``Pipeline`` is a DAG of named stages declared with ``@pipeline.stage(name)``.
+A stage's upstream stages are the parameters named after earlier stages; its
+other parameters are settings, taken from ``run(**settings)`` or the function
+defaults. With a ``StageStore``, every output is stored under a key hashing
+
+- the stage's source code (plus any helpers passed as ``code=``),
+- the source of the ``zyllica`` library itself (``library_code``), so editing
+  a fit or simulation kernel the stage calls invalidates it too,
+- its settings (canonical JSON, as in ``zyllica.cache``),
+- the content digests of the upstream outputs it consumes,
+
+so a stage reruns only when its own code, its settings or the *values* it
+reads change: editing a plot title reruns the plot stage alone, and a refit
+that reproduces the same parameters leaves the metrics cached. Stages
+declared with ``cache=False`` (plots) always run. Settings that never change
+results (``workers``, ``cache``) are left out of the keys.
+"""
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+
+from zyllica import trace
+from zyllica.cache import DEFAULT_CACHE_DIR, _canonical
+
+UNHASHED = ('workers', 'cache')
+# Modules that never change a stage's results (entry points, styling, instrumentation)
+PRESENTATION_MODULES = ('__init__', '__main__', 'cli', 'lazy', 'papers', 'render', 'style', 'trace')
+
+
+def _digest(value):
+    return hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def _source(func):
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__code__.co_code.hex()
+
+
+@functools.lru_cache(maxsize=None)
+def library_code():
+    """Digest of the source of every ``zyllica`` module that computes results (read once per process)."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        module = os.path.splitext(os.path.basename(path))[0]
+        if module not in PRESENTATION_MODULES:
+            with open(path, 'rb') as fh:
+                digest.update(module.encode() + b'\0' + fh.read())
+    return digest.hexdigest()
+
+
+class StageStore:
+    """Stage outputs as pickles under ``<root>/<pipeline>/<stage>/<key>.pkl``."""
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(os.environ.get('ZYLLICA_CACHE_DIR', DEFAULT_CACHE_DIR), 'stages')
+
+    def _path(self, pipeline, stage, key):
+        return os.path.join(self.root, pipeline, stage, f'{key}.pkl')
+
+    def get(self, pipeline, stage, key):
+        """``(output, digest)`` for this key, or None on a miss."""
+        try:
+            with open(self._path(pipeline, stage, key), 'rb') as fh:
+                return pickle.load(fh)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, pipeline, stage, key, output, digest):
+        path = self._path(pipeline, stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as fh:
+            pickle.dump((output, digest), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def clear(self, pipeline=None):
+        top = os.path.join(self.root, pipeline) if pipeline else self.root
+        for directory, _, files in os.walk(top):
+            for name in files:
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(directory, name))
+
+
+class Pipeline:
+    """Named stages wired by parameter names, run in declaration order."""
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {}
+        self.history = []
+
+    def stage(self, name, cache=True, code=()):
+        """Register ``func`` as stage ``name`` (parameters named after earlier stages are its inputs).
+
+        ``code`` lists script-level helpers whose source also belongs in the key
+        (e.g. the simulation kernel a thin stage calls); ``zyllica`` modules are
+        covered by ``library_code``.
+        """
+        def register(func):
+            params = inspect.signature(func).parameters
+            self.stages[name] = {
+                'func': func,
+                'deps': [p for p in params if p in self.stages],
+                'settings': {p: v.default for p, v in params.items() if p not in self.stages},
+                'code': hashlib.sha256(''.join(_source(f) for f in (func, *code)).encode()).hexdigest(),
+                'cache': cache,
+            }
+            return func
+        return register
+
+    def _needed(self, targets):
+        needed, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name]['deps'])
+        return [name for name in self.stages if name in needed]
+
+    def run(self, targets=None, store=None, **settings):
+        """Outputs of ``targets`` (default: every stage) and of the stages they depend on.
+
+        Stages are loaded from ``store`` when their key matches, else run and
+        stored; without a store everything runs. ``history`` records what ran.
+        """
+        targets = list(self.stages) if targets is None else [targets] if isinstance(targets, str) else list(targets)
+        unknown = set(targets) - set(self.stages)
+        if unknown:
+            raise ValueError(f'unknown stage(s) {sorted(unknown)} in pipeline {self.name!r}')
+        known = {p for spec in self.stages.values() for p in spec['settings']}
+        if set(settings) - known:
+            raise TypeError(f'unknown setting(s) {sorted(set(settings) - known)} for pipeline {self.name!r}')
+
+        outputs, digests = {}, {}
+        self.history = []
+        for name in self._needed(targets):
+            spec = self.stages[name]
+            kwargs = {p: settings.get(p, default) for p, default in spec['settings'].items()}
+            key = hashlib.sha256(json.dumps(_canonical({
+                'code': spec['code'],
+                'library': library_code(),
+                'settings': {p: v for p, v in kwargs.items() if p not in UNHASHED},
+                'inputs': {dep: digests[dep] for dep in spec['deps']},
+            }), sort_keys=True).encode()).hexdigest()
+
+            start = time.perf_counter()
+            with trace.stage(f'{self.name}.{name}') as traced:
+                hit = store.get(self.name, name, key) if store is not None and spec['cache'] else None
+                if hit is not None:
+                    outputs[name], digests[name] = hit
+                else:
+                    outputs[name] = spec['func'](**{dep: outputs[dep] for dep in spec['deps']}, **kwargs)
+                    digests[name] = _digest(outputs[name]) if spec['cache'] else key
+                    if store is not None and spec['cache']:
+                        store.put(self.name, name, key, outputs[name], digests[name])
+                traced.record(status='cached' if hit is not None else 'ran', output=outputs[name])
+            self.history.append({'stage': name, 'status': 'cached' if hit is not None else 'ran',
+                                 'seconds': time.perf_counter() - start})
+        return outputs
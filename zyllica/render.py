@@ -0,0 +1,161 @@
+"""Headless build of every paper figure.
+
+    python -m zyllica render [--out build/figures] [--workers N] [--formats png svg] [paper ...]
+
+Every paper script is run unattended in a worker of a process pool with the
+Agg backend forced. Its blocking ``plt.show()`` becomes a hook that writes
+each open figure to ``<out>/<paper>/<name>.<fmt>`` and closes it; ``name``
+is what the script passed to ``plt.savefig`` for that figure (the script's
+own save is folded into the hook), else ``figure_<k>``. The wall time from
+the previous figure (simulation, fitting and drawing) and the save time are
+reported per figure and written to ``<out>/timings.json``.
+
+Papers run in parallel; the scripts' own simulations get ``workers=1`` so the
+figure-level pool does not oversubscribe the cores. Entry points split into
+memoized stages (``zyllica.pipeline``) get the default ``StageStore``, so a
+re-render only recomputes the stages whose code or settings changed.
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import sys
+import time
+import traceback
+
+from zyllica.papers import PAPERS, check_papers, load_paper
+from zyllica.parallel import parallel_imap
+from zyllica.pipeline import StageStore
+
+
+class _FigureSink:
+    """Replacement for ``plt.show`` / ``plt.savefig`` that writes figures in every format and times them."""
+
+    def __init__(self, plt, paper, out_dir, formats):
+        self.plt, self.paper, self.out_dir, self.formats = plt, paper, out_dir, formats
+        self.names = {}
+        self.records = []
+        self.mark = time.perf_counter()
+
+    def savefig(self, fname):
+        if isinstance(fname, (str, os.PathLike)):
+            self.names[self.plt.gcf().number] = os.path.splitext(os.path.basename(fname))[0]
+
+    def show(self):
+        for number in self.plt.get_fignums():
+            fig = self.plt.figure(number)
+            name = self.names.pop(number, f'figure_{len(self.records) + 1:02d}')
+            start = time.perf_counter()
+            files = []
+            for fmt in self.formats:
+                path = os.path.join(self.out_dir, f'{name}.{fmt}')
+                fig.savefig(path)
+                files.append(os.path.relpath(path, os.path.dirname(self.out_dir)))
+            end = time.perf_counter()
+            self.plt.close(fig)
+            self.records.append({'paper': self.paper, 'figure': name, 'files': files,
+                                 'seconds': end - self.mark, 'save_seconds': end - start})
+            self.mark = end
+
+
+@contextlib.contextmanager
+def figure_sink(paper, out_root, formats=('png', 'svg')):
+    """Run the block headless with every figure written to ``<out_root>/<paper>/``; yields the sink.
+
+    Forces Agg, swaps ``plt.show`` / ``plt.savefig`` for a ``_FigureSink`` and
+    runs inside that directory, so nothing a script saves lands in the
+    caller's working directory. Figures left open are written on exit.
+    """
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')  # resolve the backend before pyplot.show is swapped out
+
+    out_dir = os.path.join(os.path.abspath(out_root), paper)
+    os.makedirs(out_dir, exist_ok=True)
+    sink = _FigureSink(plt, paper, out_dir, formats)
+    show, savefig, cwd = plt.show, plt.savefig, os.getcwd()
+
+    def show_hook(*args, **kwargs):
+        sink.show()
+
+    def savefig_hook(fname, *args, **kwargs):
+        sink.savefig(fname)
+
+    plt.show, plt.savefig = show_hook, savefig_hook
+    try:
+        # Styles and rcParams set by a script stay inside its own context
+        with matplotlib.rc_context():
+            os.chdir(out_dir)
+            yield sink
+            sink.show()  # figures left open without a show
+    finally:
+        plt.show, plt.savefig = show, savefig
+        plt.close('all')
+        os.chdir(cwd)
+
+
+def _render_paper(task):
+    """Run one paper script headless and return its figure records (worker task)."""
+    paper, out_root, formats = task
+    error, records = None, []
+    try:
+        with figure_sink(paper, out_root, formats) as sink:
+            records = sink.records
+            module = load_paper(paper)
+            for entry in PAPERS[paper][1]:
+                func = getattr(module, entry)
+                params = inspect.signature(func).parameters
+                kwargs = {'workers': 1} if 'workers' in params else {}
+                if 'store' in params:
+                    kwargs['store'] = StageStore()
+                func(**kwargs)
+    except Exception:
+        error = traceback.format_exc()
+    return {'paper': paper, 'figures': records, 'error': error}
+
+
+def render_all(papers=None, out='build/figures', workers=None, formats=('png', 'svg')):
+    """Render the selected papers (default all) and return their results in ``PAPERS`` order.
+
+    Results are printed as they arrive and saved to ``<out>/timings.json``.
+    """
+    os.environ['MPLBACKEND'] = 'Agg'  # inherited by the pool's workers
+    papers = list(PAPERS) if not papers else list(papers)
+    check_papers(papers)
+    out = os.path.abspath(out)
+    os.makedirs(out, exist_ok=True)
+
+    start = time.perf_counter()
+    tasks = [(paper, out, tuple(formats)) for paper in papers]
+    results = []
+    for result in parallel_imap(_render_paper, tasks, workers):
+        results.append(result)
+        for record in result['figures']:
+            print(f"{record['paper']:<22} {record['figure']:<32} {record['seconds']:>8.2f} s "
+                  f"(save {record['save_seconds']:.2f} s)")
+        if result['error']:
+            print(f"{result['paper']:<22} FAILED\n{result['error']}", file=sys.stderr)
+    total = time.perf_counter() - start
+    n_figures = sum(len(result['figures']) for result in results)
+    print(f"{n_figures} figures from {len(results)} papers in {total:.2f} s -> {out}")
+
+    with open(os.path.join(out, 'timings.json'), 'w') as fh:
+        json.dump({'total_seconds': total, 'formats': list(formats), 'papers': results}, fh, indent=2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render every paper figure headless (PNG + SVG).')
+    parser.add_argument('papers', nargs='*', help=f'subset of: {", ".join(PAPERS)}')
+    parser.add_argument('--out', default='build/figures', help='output directory (default: build/figures)')
+    parser.add_argument('--workers', type=int, default=None, help='papers rendered in parallel (default: all cores)')
+    parser.add_argument('--formats', nargs='+', default=['png', 'svg'], help='output formats (default: png svg)')
+    args = parser.parse_args(argv)
+    results = render_all(args.papers, args.out, args.workers, args.formats)
+    return 1 if any(result['error'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
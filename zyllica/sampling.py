@@ -0,0 +1,136 @@
+"""Variance-reduction sampling modes for GBM simulators.
+
+``standard_normals`` produces the [steps x paths] shock matrix for a chosen
+mode, and ``estimate_terminal_risk`` measures the standard error each mode
+actually achieves from independent replicates. Comparing those errors shows
+how many plain Monte Carlo paths a mode is worth.
+"""
+import warnings
+
+import numpy as np
+from scipy.special import ndtri
+
+from zyllica.lazy import lazy_import
+from zyllica.parallel import run_blocks
+
+qmc = lazy_import('scipy.stats.qmc')  # only the sobol mode needs it
+
+SAMPLING_MODES = ('plain', 'antithetic', 'control_variate', 'sobol')
+PATH_SAMPLING_MODES = ('plain', 'antithetic', 'sobol')  # modes that change the draws themselves
+
+
+def standard_normals(rng, shape, sampling='plain'):
+    """Standard normal shocks of shape ``(steps, paths)`` for a sampling mode.
+
+    - ``plain`` / ``control_variate``: i.i.d. draws (the control variate acts on
+      the estimator, see ``control_variate_weights``).
+    - ``antithetic``: the second half of the paths mirrors the first (Z, -Z).
+    - ``sobol``: scrambled Sobol points (one dimension per step) mapped through
+      the normal inverse CDF. Each call is an independent randomisation.
+    """
+    steps, n = shape
+    if sampling in ('plain', 'control_variate'):
+        return rng.standard_normal(shape)
+    if sampling == 'antithetic':
+        half = rng.standard_normal((steps, (n + 1) // 2))
+        return np.concatenate([half, -half], axis=1)[:, :n]
+    if sampling == 'sobol':
+        # Legacy RandomState (np.random) has no bit generator to hand over
+        seed = rng if isinstance(rng, np.random.Generator) else rng.randint(2**31)
+        sobol = qmc.Sobol(d=steps, scramble=True, seed=seed)
+        with warnings.catch_warnings():
+            # Non power-of-two sample sizes only lose some balance, not validity
+            warnings.simplefilter('ignore', UserWarning)
+            u = sobol.random(n)
+        return ndtri(u).T
+    raise ValueError(f"Unknown sampling mode {sampling!r}; expected one of {SAMPLING_MODES}")
+
+
+def check_path_sampling(sampling, estimator):
+    """Reject ``control_variate`` in a path generator, where it would silently mean ``plain``.
+
+    The control variate reweights terminal estimates and leaves the draws
+    unchanged; ``estimator`` names the function that applies it.
+    """
+    if sampling == 'control_variate':
+        raise ValueError(f"control_variate does not change the simulated paths; it reweights terminal "
+                         f"estimates, use {estimator} (path modes: {PATH_SAMPLING_MODES})")
+
+
+def control_variate_weights(control, expected):
+    """Sample weights that make the weighted mean of ``control`` equal ``expected``.
+
+    Regression-adjusted empirical distribution (Hesterberg & Nelson): applying
+    these weights to any statistic (mean, quantile, tail mean) gives its control
+    variate estimator. Weights sum to one.
+    """
+    control = np.asarray(control, dtype=float)
+    n = len(control)
+    dev = control - control.mean()
+    return 1.0 / n + (expected - control.mean()) * dev / (dev @ dev)
+
+
+def tail_metrics(values, alpha=0.05, weights=None):
+    """Mean, VaR (alpha-quantile) and CVaR (mean below VaR) of a sample."""
+    values = np.asarray(values, dtype=float)
+    if weights is None:
+        var = np.percentile(values, 100 * alpha)
+        return values.mean(), var, values[values <= var].mean()
+
+    order = np.argsort(values)
+    sorted_values, sorted_weights = values[order], weights[order]
+    cum_weights = np.cumsum(sorted_weights)
+    k = min(np.searchsorted(cum_weights, alpha * cum_weights[-1]), len(values) - 1)
+    var = sorted_values[k]
+    cvar = (sorted_values[:k + 1] @ sorted_weights[:k + 1]) / cum_weights[k]
+    return weights @ values, var, cvar
+
+
+def _replicate_block(rng, n, simulate_terminal, sim_args, sampling, expected, alpha):
+    terminal = simulate_terminal(rng, n, *sim_args, sampling)
+    weights = None
+    if sampling == 'control_variate':
+        weights = control_variate_weights(terminal, expected)
+    return tail_metrics(terminal, alpha, weights)
+
+
+def estimate_terminal_risk(simulate_terminal, sim_args, sims, sampling='plain', expected=None,
+                           alpha=0.05, replicates=16, seed=42, workers=None):
+    """Mean / VaR / CVaR of the terminal value with their standard errors.
+
+    ``simulate_terminal(rng, n, *sim_args, sampling)`` must return ``n`` terminal
+    values and be a module-level function. The budget of ``sims`` paths is split
+    into ``replicates`` independent runs; estimates are the replicate average and
+    standard errors the replicate spread / sqrt(replicates). ``expected`` is the
+    analytic E[S_T], required for the control variate mode.
+    """
+    if sampling == 'control_variate' and expected is None:
+        raise ValueError("control_variate sampling needs the analytic expected terminal value")
+    block_size = -(-sims // replicates)
+    results = np.array(run_blocks(_replicate_block, sims, seed, block_size=block_size, workers=workers,
+                                  args=(simulate_terminal, sim_args, sampling, expected, alpha)))
+    estimate = results.mean(axis=0)
+    se = results.std(axis=0, ddof=1) / np.sqrt(len(results))
+    return {
+        'sampling': sampling,
+        'sims': sims,
+        'mean': estimate[0], 'mean_se': se[0],
+        'var': estimate[1], 'var_se': se[1],
+        'cvar': estimate[2], 'cvar_se': se[2],
+    }
+
+
+def compare_sampling_modes(simulate_terminal, sim_args, sims, expected, modes=SAMPLING_MODES,
+                           alpha=0.05, replicates=16, seed=42, workers=None):
+    """Run every mode on the same budget and report its path-budget savings.
+
+    ``var_efficiency`` is (SE_plain / SE_mode)^2 for VaR: how many times more
+    plain Monte Carlo paths would be needed to reach the same precision.
+    """
+    reports = [estimate_terminal_risk(simulate_terminal, sim_args, sims, mode, expected,
+                                      alpha, replicates, seed, workers) for mode in modes]
+    baseline = next((r for r in reports if r['sampling'] == 'plain'), reports[0])
+    for report in reports:
+        report['var_efficiency'] = (baseline['var_se'] / report['var_se'])**2
+        report['cvar_efficiency'] = (baseline['cvar_se'] / report['cvar_se'])**2
+    return reports
@@ -0,0 +1,188 @@
+"""Mergeable partial statistics for chunked and parallel Monte Carlo.
+
+Every accumulator exposes ``update`` (fold in raw observations) and ``merge``
+(fold in another accumulator), so blocks produced by different workers can be
+combined in a fixed order with ``merge_all``.
+"""
+import numpy as np
+
+
+def _rowwise_interp(targets, xp, fp):
+    """np.interp applied independently to every row of (xp, fp), fully vectorized.
+
+    xp rows must be increasing and lie in [0, 1]; targets is shared by all rows.
+    """
+    rows, m = xp.shape
+    offsets = 2.0 * np.arange(rows)[:, None]
+    flat_xp = (xp + offsets).ravel()
+    flat_fp = fp.ravel()
+    flat_t = targets[None, :] + offsets
+
+    first = m * np.arange(rows)[:, None]
+    idx = np.searchsorted(flat_xp, flat_t.ravel(), side='right').reshape(flat_t.shape)
+    idx = np.clip(idx, first + 1, first + m - 1)
+
+    x0, x1 = flat_xp[idx - 1], flat_xp[idx]
+    y0, y1 = flat_fp[idx - 1], flat_fp[idx]
+    span = np.where(x1 > x0, x1 - x0, 1.0)
+    frac = np.clip((flat_t - x0) / span, 0.0, 1.0)
+    return y0 + frac * (y1 - y0)
+
+
+class QuantileSketch:
+    """Mergeable per-row quantile sketch (t-digest style, uniform compression).
+
+    Keeps at most `size` equally weighted points per row, so memory is O(rows x size)
+    no matter how many observations are streamed through `update`.
+    """
+
+    def __init__(self, n_rows, size=4096):
+        self.size = size
+        self.count = 0
+        self.values = np.empty((n_rows, 0))
+
+    def update(self, batch):
+        """Add a [rows x n] block of observations (1-D input is a single row)."""
+        batch = np.atleast_2d(np.asarray(batch, dtype=float))
+        self._merge(batch, batch.shape[1])
+
+    def merge(self, other):
+        """Fold another sketch (e.g. from a different chunk or worker) into this one."""
+        self._merge(other.values, other.count)
+
+    def _merge(self, values, count):
+        if count == 0:
+            return
+        m_self, m_new = self.values.shape[1], values.shape[1]
+        total = self.count + count
+        merged = np.concatenate([self.values, values], axis=1)
+        order = np.argsort(merged, axis=1)
+        merged = np.take_along_axis(merged, order, axis=1)
+
+        # Every stored point carries the same weight (count / points)
+        is_raw = (m_self == self.count) and (m_new == count)
+        if is_raw and total <= self.size:
+            self.values, self.count = merged, total
+            return
+
+        weights = np.concatenate([
+            np.full(m_self, self.count / max(m_self, 1)),
+            np.full(m_new, count / m_new),
+        ])[order]
+        cum_weights = np.cumsum(weights, axis=1)
+        mid_levels = (cum_weights - 0.5 * weights) / total
+        targets = (np.arange(self.size) + 0.5) / self.size
+        self.values = _rowwise_interp(targets, mid_levels, merged)
+        self.count = total
+
+    def quantile(self, q):
+        """Per-row quantile(s) for level(s) q in [0, 1]; shape (len(q), rows) for arrays."""
+        q = np.asarray(q, dtype=float)
+        m = self.values.shape[1]
+        pos = np.clip(q * m - 0.5, 0, m - 1)
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, m - 1)
+        frac = pos - lo
+        lo_vals = self.values[:, lo]
+        hi_vals = self.values[:, hi]
+        return np.moveaxis(lo_vals + frac * (hi_vals - lo_vals), 0, -1)
+
+    def tail_mean(self, alpha, row=-1):
+        """Mean of the lowest `alpha` probability mass in one row (CVaR)."""
+        values = self.values[row]
+        k = alpha * len(values)
+        whole = int(np.floor(k))
+        partial = values[whole] * (k - whole) if whole < len(values) else 0.0
+        return (values[:whole].sum() + partial) / k
+
+
+class Histogram:
+    """Fixed-edge histogram; counts from different blocks simply add up."""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1)
+
+    def update(self, values, weights=None):
+        """Add observations; with ``weights`` the bins accumulate sums instead of counts."""
+        self.counts += np.histogram(values, bins=self.edges, weights=weights)[0]
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    @property
+    def centers(self):
+        return 0.5 * (self.edges[1:] + self.edges[:-1])
+
+
+class Moments:
+    """Count, mean and central moments up to order 4 (Chan et al. pairwise merge).
+
+    Works element-wise, so a single accumulator can track one statistic per
+    time step or per asset by passing ``[rows x n]`` blocks with ``axis=-1``.
+    """
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.m3 = np.zeros(shape)
+        self.m4 = np.zeros(shape)
+
+    def update(self, values, axis=-1):
+        values = np.asarray(values, dtype=float)
+        block = Moments()
+        block.count = values.shape[axis]
+        block.mean = values.mean(axis=axis)
+        dev = values - np.expand_dims(block.mean, axis)
+        block.m2 = (dev**2).sum(axis=axis)
+        block.m3 = (dev**3).sum(axis=axis)
+        block.m4 = (dev**4).sum(axis=axis)
+        self.merge(block)
+
+    def merge(self, other):
+        n_a, n_b = self.count, other.count
+        if n_b == 0:
+            return
+        if n_a == 0:
+            self.count, self.mean = n_b, other.mean
+            self.m2, self.m3, self.m4 = other.m2, other.m3, other.m4
+            return
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta**2 * n_a * n_b / n
+        m3 = (self.m3 + other.m3
+              + delta**3 * n_a * n_b * (n_a - n_b) / n**2
+              + 3 * delta * (n_a * other.m2 - n_b * self.m2) / n)
+        m4 = (self.m4 + other.m4
+              + delta**4 * n_a * n_b * (n_a**2 - n_a * n_b + n_b**2) / n**3
+              + 6 * delta**2 * (n_a**2 * other.m2 + n_b**2 * self.m2) / n**2
+              + 4 * delta * (n_a * other.m3 - n_b * self.m3) / n)
+        self.mean = self.mean + delta * n_b / n
+        self.m2, self.m3, self.m4, self.count = m2, m3, m4, n
+
+    @property
+    def variance(self):
+        return self.m2 / max(self.count - 1, 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def skewness(self):
+        return np.sqrt(self.count) * self.m3 / self.m2**1.5
+
+    @property
+    def kurtosis(self):
+        """Excess kurtosis."""
+        return self.count * self.m4 / self.m2**2 - 3.0
+
+
+def merge_all(partials):
+    """Fold an iterable of accumulators (left to right) into the first one."""
+    partials = iter(partials)
+    result = next(partials)
+    for partial in partials:
+        result.merge(partial)
+    return result
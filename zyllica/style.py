@@ -0,0 +1,24 @@
+"""Figure styles applied per call instead of at import time.
+
+Paper scripts used to call ``plt.style.use`` / set ``plt.rcParams`` at module
+level, which imported matplotlib and restyled the whole process as a side
+effect of importing them. ``paper_style`` runs a figure function inside
+``matplotlib.style.context`` so the style only holds while it draws.
+"""
+import functools
+
+
+def paper_style(style):
+    """Decorator: run the function inside ``plt.style.context(style)``.
+
+    ``style`` is anything ``matplotlib.style.context`` accepts: a style name,
+    a dict of rcParams, or a list of those applied in order.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            import matplotlib.pyplot as plt
+            with plt.style.context(style):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
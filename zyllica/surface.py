@@ -0,0 +1,105 @@
+"""Tiled evaluation of 2-D risk surfaces at arbitrary resolution.
+
+``tiled_pyramid`` evaluates ``func(x, y)`` over a ``len(y) x len(x)`` grid one
+tile at a time from broadcast coordinate slices (a ``1 x w`` row of ``x`` and
+an ``h x 1`` column of ``y``, as ``np.ogrid`` gives), so no meshgrid copies
+exist. Each tile is written to a file-backed array through a short-lived
+memory map and, in the same pass, 2 x 2 mean-pooled into every coarser level
+of a resolution pyramid (tile offsets are multiples of ``2^level``, so
+pooling tile by tile is exact). Only the current tile is ever resident, so
+peak memory is O(tile^2) whatever the resolution. ``pyramid_level`` picks the
+coarsest level that still covers the pixels to be drawn.
+"""
+import os
+import tempfile
+
+import numpy as np
+
+
+class _LevelFile:
+    """A 2-D array on disk (``.npy`` in ``directory``, else an anonymous temporary file)."""
+
+    def __init__(self, shape, dtype, directory, index):
+        self.shape, self.dtype = shape, np.dtype(dtype)
+        if directory is None:
+            self._fh = tempfile.TemporaryFile()
+            self._fh.truncate(int(np.prod(shape)) * self.dtype.itemsize)
+            self.path = None
+        else:
+            self.path = os.path.join(directory, f'level_{index}.npy')
+            np.lib.format.open_memmap(self.path, mode='w+', dtype=self.dtype, shape=shape).flush()
+
+    def open(self, mode):
+        if self.path is None:
+            return np.memmap(self._fh, dtype=self.dtype, mode=mode, shape=self.shape)
+        return np.load(self.path, mmap_mode=mode)
+
+    def write(self, i0, j0, block):
+        view = self.open('r+')
+        view[i0:i0 + block.shape[0], j0:j0 + block.shape[1]] = block
+        view.flush()
+        del view  # unmap, so written pages stop counting against this process
+
+
+def _pool(block):
+    """2 x 2 mean pooling, dropping an odd trailing row/column."""
+    h, w = block.shape[0] // 2, block.shape[1] // 2
+    return block[:2 * h, :2 * w].reshape(h, 2, w, 2).mean(axis=(1, 3))
+
+
+def tiled_pyramid(func, x, y, min_size=256, tile=2048, dtype=np.float32, directory=None):
+    """``func(x, y)`` on the grid plus its 2 x 2 mean-pooled pyramid, computed in one tiled pass.
+
+    Parameters
+    ----------
+    func : callable
+        Surface ``func(x, y)``; must broadcast a ``[1 x w]`` x-slice against an
+        ``[h x 1]`` y-slice. Row ``i`` / column ``j`` holds ``func(x[j], y[i])``.
+    min_size : int
+        Coarsest level kept: halving stops before the shorter side drops below it.
+    tile : int
+        Tile side; a power of two at least ``2^levels`` keeps the pooling exact.
+    directory : str, optional
+        Where to keep the levels as ``level_<k>.npy``; by default they live in
+        temporary files that disappear with the arrays.
+
+    Returns
+    -------
+    list of read-only ``np.memmap`` levels, finest (full resolution) first.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    shapes = [(len(y), len(x))]
+    while min(shapes[-1]) // 2 >= min_size:
+        shapes.append((shapes[-1][0] // 2, shapes[-1][1] // 2))
+    if tile % 2**(len(shapes) - 1):
+        raise ValueError(f'tile={tile} must be a multiple of 2^{len(shapes) - 1} for exact pooling')
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    levels = [_LevelFile(shape, dtype, directory, k) for k, shape in enumerate(shapes)]
+
+    for i0 in range(0, len(y), tile):
+        y_tile = y[i0:i0 + tile, None]
+        for j0 in range(0, len(x), tile):
+            block = np.asarray(func(x[None, j0:j0 + tile], y_tile), dtype=np.float64)
+            for k, level in enumerate(levels):
+                if k:
+                    block = _pool(block)
+                if block.size:
+                    level.write(i0 >> k, j0 >> k, block.astype(dtype, copy=False))
+    return [level.open('r') for level in levels]
+
+
+def tiled_surface(func, x, y, tile=2048, dtype=np.float32, directory=None):
+    """Full-resolution ``func(x, y)`` only (a single-level ``tiled_pyramid``)."""
+    return tiled_pyramid(func, x, y, min_size=max(len(x), len(y)) + 1, tile=tile, dtype=dtype,
+                         directory=directory)[0]
+
+
+def pyramid_level(levels, pixels):
+    """Coarsest level with at least ``pixels = (width, height)`` samples (else the finest)."""
+    width, height = pixels
+    for level in reversed(levels):
+        if level.shape[1] >= width and level.shape[0] >= height:
+            return level
+    return levels[0]
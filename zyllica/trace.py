@@ -0,0 +1,291 @@
+"""Opt-in stage instrumentation: wall / CPU time, peak RSS and array sizes.
+
+    from zyllica.trace import stage, traced, tracing
+
+    with tracing('evt.json'):      # Chrome trace (chrome://tracing or ui.perfetto.dev)
+        generate_clean_evt_plots()
+    with tracing('evt.jsonl'):     # one JSON object per stage, written as it closes
+        generate_clean_evt_plots()
+
+or set ``ZYLLICA_TRACE=<file>`` (``python -m zyllica run <paper> --trace <file>``).
+Code marks its stages with ``with stage('name') as s: ... s.record(paths=paths)``
+or the ``@traced`` decorator. Every closed stage reports
+
+- ``wall`` and ``cpu`` seconds (this process, plus ``cpu_children`` for pool
+  workers reaped inside the stage),
+- ``rss`` at exit and ``peak_rss`` reached inside the stage (bytes; exact per
+  stage on Linux, where the high-water mark is reset at every stage entry,
+  else the process peak so far; None where neither ``/proc`` nor the POSIX
+  ``resource`` module is available, e.g. Windows, as is ``cpu_children``),
+- ``arrays``: shape, dtype and bytes of the arrays handed to ``record`` (other
+  values given to ``record`` are kept as plain fields),
+- with ``allocations=True``, ``peak_alloc``: the peak of tracemalloc-tracked
+  memory inside the stage (numpy reports its buffers to tracemalloc). This
+  slows pure-Python code noticeably, so it is off by default.
+
+Tracing is off unless started. ``stage`` then returns a shared no-op object
+and a ``traced`` function makes one extra call, so the hooks can stay in hot
+code. Only the process that started tracing records; pool workers forked from
+it do not.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, the memory / child CPU fields are None
+    resource = None
+
+_TRACER = None
+_CLEAR_REFS = '/proc/self/clear_refs'
+_STATUS = '/proc/self/status'
+
+
+def _status_bytes(*fields):
+    """``VmRSS`` / ``VmHWM`` style fields of ``/proc/self/status`` in bytes (None off Linux)."""
+    try:
+        with open(_STATUS) as fh:
+            values = {line.split(':')[0]: int(line.split()[1]) * 1024 for line in fh if line.startswith(fields)}
+    except OSError:
+        return None
+    return [values.get(field) for field in fields]
+
+
+def _reset_peak_rss():
+    try:
+        with open(_CLEAR_REFS, 'w') as fh:
+            fh.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _rss():
+    """``(current, peak)`` resident set size in bytes (``(None, None)`` when unavailable)."""
+    status = _status_bytes('VmRSS', 'VmHWM')
+    if status is not None and None not in status:
+        return tuple(status)
+    if resource is None:
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak *= 1 if os.uname().sysname == 'Darwin' else 1024
+    return peak, peak
+
+
+def _children_cpu():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _describe(value):
+    return {'shape': list(value.shape), 'dtype': str(value.dtype), 'bytes': int(value.nbytes)}
+
+
+class _NullStage:
+    """What ``stage`` returns while tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def record(self, **values):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, tracer, name, fields):
+        self.tracer, self.name = tracer, name
+        self.fields, self.arrays = dict(fields), {}
+        self.peak_rss = None
+        self.peak_alloc = 0
+
+    def record(self, **values):
+        """Attach arrays (described by shape / dtype / bytes) or plain fields to the stage."""
+        for key, value in values.items():
+            if isinstance(value, np.ndarray):
+                self.arrays[key] = _describe(value)
+            else:
+                self.fields[key] = value
+
+    def __enter__(self):
+        self.tracer._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        self.tracer._exit(self)
+        return False
+
+
+class Tracer:
+    """Collects closed stages and writes them as JSON lines or a Chrome trace.
+
+    Parameters
+    ----------
+    path : str
+        Output file; ``.jsonl`` gives JSON lines, anything else a Chrome trace
+        (unless ``format`` says otherwise).
+    format : {'chrome', 'jsonl'}, optional
+    allocations : bool
+        Also track the tracemalloc peak inside every stage.
+    """
+
+    def __init__(self, path, format=None, allocations=False):
+        self.path = path
+        self.format = format or ('jsonl' if path.endswith('.jsonl') else 'chrome')
+        if self.format not in ('chrome', 'jsonl'):
+            raise ValueError(f"unknown trace format {self.format!r}; expected 'chrome' or 'jsonl'")
+        self.allocations = allocations
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.stack = []
+        self.events = []
+        self.exact_rss = _reset_peak_rss()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = allocations and not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        self._out = open(path, 'w') if self.format == 'jsonl' else None
+
+    def _checkpoint(self):
+        """Fold the peaks reached so far into every open stage, then reset them."""
+        peak = _rss()[1]
+        alloc = tracemalloc.get_traced_memory()[1] if self.allocations else 0
+        for open_stage in self.stack:
+            if peak is not None:
+                open_stage.peak_rss = max(open_stage.peak_rss or 0, peak)
+            open_stage.peak_alloc = max(open_stage.peak_alloc, alloc)
+        if self.exact_rss:
+            _reset_peak_rss()
+        if self.allocations:
+            tracemalloc.reset_peak()
+
+    def _enter(self, stage):
+        self._checkpoint()
+        stage.path = '/'.join([s.name for s in self.stack] + [stage.name])
+        self.stack.append(stage)
+        stage.start = time.perf_counter()
+        stage.cpu = time.process_time()
+        stage.cpu_children = _children_cpu()
+
+    def _exit(self, stage):
+        end, cpu, cpu_children = time.perf_counter(), time.process_time(), _children_cpu()
+        self._checkpoint()
+        self.stack.pop()
+        event = {
+            'name': stage.name,
+            'path': stage.path,
+            'start': stage.start - self.origin,
+            'wall': end - stage.start,
+            'cpu': cpu - stage.cpu,
+            'cpu_children': None if cpu_children is None else cpu_children - stage.cpu_children,
+            'rss': _rss()[0],
+            'peak_rss': stage.peak_rss,
+        }
+        if self.allocations:
+            event['peak_alloc'] = stage.peak_alloc
+        if stage.arrays:
+            event['arrays'] = stage.arrays
+        event.update(stage.fields)
+        with self._lock:
+            if self._out is not None:
+                self._out.write(json.dumps(event, default=str) + '\n')
+                self._out.flush()
+            else:
+                self.events.append(event)
+
+    def _chrome(self):
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': 'zyllica'}}]
+        for event in self.events:
+            args = {key: value for key, value in event.items() if key not in ('name', 'start', 'wall')}
+            events.append({'name': event['name'], 'cat': 'stage', 'ph': 'X', 'pid': self.pid, 'tid': 0,
+                           'ts': 1e6 * event['start'], 'dur': 1e6 * event['wall'], 'args': args})
+            if event['rss'] is not None:
+                events.append({'name': 'memory', 'ph': 'C', 'pid': self.pid,
+                               'ts': 1e6 * (event['start'] + event['wall']),
+                               'args': {'rss_mb': event['rss'] / 2**20, 'peak_rss_mb': event['peak_rss'] / 2**20}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+        else:
+            with open(self.path, 'w') as fh:
+                json.dump(self._chrome(), fh, default=str)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+
+def start_tracing(path, format=None, allocations=False):
+    """Start recording stages to ``path`` (see ``Tracer``); returns the tracer."""
+    global _TRACER
+    if _TRACER is not None:
+        raise RuntimeError(f'already tracing to {_TRACER.path!r}')
+    _TRACER = Tracer(path, format, allocations)
+    return _TRACER
+
+
+def stop_tracing():
+    """Stop recording and write the trace (no-op when not tracing)."""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None and tracer.pid == os.getpid():
+        tracer.close()
+
+
+class tracing:
+    """Context manager around ``start_tracing`` / ``stop_tracing``."""
+
+    def __init__(self, path, format=None, allocations=False):
+        self.args = (path, format, allocations)
+
+    def __enter__(self):
+        return start_tracing(*self.args)
+
+    def __exit__(self, *exc):
+        stop_tracing()
+        return False
+
+
+def stage(name, **fields):
+    """Context manager timing the block as stage ``name`` (a shared no-op unless tracing)."""
+    tracer = _TRACER
+    if tracer is None or tracer.pid != os.getpid():
+        return _NULL_STAGE
+    return _Stage(tracer, name, fields)
+
+
+def traced(func=None, *, name=None):
+    """Decorator recording every call of ``func`` as a stage (``@traced`` or ``@traced(name=...)``)."""
+    if func is None:
+        return functools.partial(traced, name=name)
+    label = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _TRACER is None:
+            return func(*args, **kwargs)
+        with stage(label):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+if os.environ.get('ZYLLICA_TRACE'):
+    # Popped so worker processes started by spawn do not reopen (and truncate) the file
+    start_tracing(os.environ.pop('ZYLLICA_TRACE'))
+    atexit.register(stop_tracing)